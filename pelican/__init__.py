@@ -27,13 +27,20 @@ from pelican.generators import (
     SourceFileGenerator,
     StaticGenerator,
     TemplatePagesGenerator,
+    TemplateRegistry,
 )
+from pelican import cache, profiling
+from pelican.cache import FileDataCacher
+from pelican.contents import Content
+from pelican.inventory import ContentInventory
+from pelican.links import LinkIndex
 from pelican.plugins import signals
 from pelican.plugins._utils import get_plugin_name, load_plugins
+from pelican.readers import Readers
 from pelican.server import ComplexHTTPRequestHandler, RootedHTTPServer
 from pelican.settings import read_settings
 from pelican.utils import clean_output_dir, maybe_pluralize, wait_for_changes
-from pelican.writers import Writer
+from pelican.writers import ParallelWriter, Writer
 
 try:
     __version__ = importlib.metadata.version("pelican")
@@ -93,57 +100,105 @@ class Pelican:
     def run(self):
         """Run the generators and return"""
         start_time = time.time()
+        profiling.start(self.settings)
 
-        context = self.settings.copy()
-        # Share these among all the generators and content objects
-        # They map source paths to Content objects or None
-        context["generated_content"] = {}
-        context["static_links"] = set()
-        context["static_content"] = {}
-        context["localsiteurl"] = self.settings["SITEURL"]
-
-        generators = [
-            cls(
-                context=context,
-                settings=self.settings,
-                path=self.path,
-                theme=self.theme,
-                output_path=self.output_path,
-            )
-            for cls in self._get_generator_classes()
-        ]
-
-        # Delete the output directory if (1) the appropriate setting is True
-        # and (2) that directory is not the parent of the source directory
-        if self.delete_outputdir and os.path.commonpath(
-            [os.path.realpath(self.output_path)]
-        ) != os.path.commonpath(
-            [os.path.realpath(self.output_path), os.path.realpath(self.path)]
-        ):
-            clean_output_dir(self.output_path, self.output_retention)
-
-        for p in generators:
-            if hasattr(p, "generate_context"):
-                p.generate_context()
-            if hasattr(p, "check_disabled_readers"):
-                p.check_disabled_readers()
-
-        # for plugins that create/edit the summary
-        logger.debug("Signal all_generators_finalized.send(<generators>)")
-        signals.all_generators_finalized.send(generators)
-
-        # update links in the summary, etc
-        for p in generators:
-            if hasattr(p, "refresh_metadata_intersite_links"):
-                p.refresh_metadata_intersite_links()
-
-        writer = self._get_writer()
-
-        for p in generators:
-            if hasattr(p, "generate_output"):
-                p.generate_output(writer)
+        # stop in any case, to restore the signals patched by the tracer
+        try:
+            context = self.settings.copy()
+            # Share these among all the generators and content objects
+            # They map source paths to Content objects or None
+            context["generated_content"] = {}
+            context["static_links"] = set()
+            context["static_content"] = {}
+            context["localsiteurl"] = self.settings["SITEURL"]
+            # Lists the content directories once for all the generators
+            context["content_inventory"] = ContentInventory()
+            # Loads the templates once for all the generators
+            context["template_registry"] = TemplateRegistry(self.settings, self.theme)
+            # Constructs the readers once for all the generators
+            context["readers"] = Readers(self.settings)
+            # Resolves the intrasite links once for all the content objects
+            context["link_index"] = LinkIndex()
+
+            generators = []
+            for cls in self._get_generator_classes():
+                with profiling.phase("__init__", cls):
+                    generators.append(
+                        cls(
+                            context=context,
+                            settings=self.settings,
+                            path=self.path,
+                            theme=self.theme,
+                            output_path=self.output_path,
+                        )
+                    )
 
-        signals.finalized.send(self)
+            # Delete the output directory if (1) the appropriate setting is True
+            # and (2) that directory is not the parent of the source directory
+            if self.delete_outputdir and os.path.commonpath(
+                [os.path.realpath(self.output_path)]
+            ) != os.path.commonpath(
+                [os.path.realpath(self.output_path), os.path.realpath(self.path)]
+            ):
+                clean_output_dir(self.output_path, self.output_retention)
+
+            for p in generators:
+                if hasattr(p, "generate_context"):
+                    with profiling.phase("generate_context", p):
+                        p.generate_context()
+                if hasattr(p, "check_disabled_readers"):
+                    with profiling.phase("check_disabled_readers", p):
+                        p.check_disabled_readers()
+
+            # for plugins that create/edit the summary
+            logger.debug("Signal all_generators_finalized.send(<generators>)")
+            with profiling.phase("all_generators_finalized"):
+                signals.all_generators_finalized.send(generators)
+
+            # update links in the summary, etc
+            for p in generators:
+                if hasattr(p, "refresh_metadata_intersite_links"):
+                    with profiling.phase("refresh_metadata_intersite_links", p):
+                        p.refresh_metadata_intersite_links()
+
+            writer = self._get_writer()
+
+            for p in generators:
+                if hasattr(p, "generate_output"):
+                    with profiling.phase("generate_output", p):
+                        p.generate_output(writer)
+
+            if hasattr(writer, "flush"):
+                with profiling.phase("flush", writer):
+                    writer.flush()
+
+            if getattr(writer, "build_graph", None) is not None:
+                writer.build_graph.save_cache()
+                console.print(writer.build_graph.report())
+            context["readers"].highlight_cache.save_cache()
+
+            with profiling.phase("finalized"):
+                signals.finalized.send(self)
+        finally:
+            profiling.stop(self.settings, console)
+
+        cachers = [
+            cacher
+            for p in generators
+            for cacher in (p, getattr(p, "readers", None))
+            if isinstance(cacher, FileDataCacher)
+        ]
+        cachers.append(context["readers"].highlight_cache)
+        if getattr(writer, "build_graph", None) is not None:
+            cachers.append(writer.build_graph)
+        cache.report(cachers, self.settings, console)
+        if logger.isEnabledFor(logging.DEBUG):
+            for method in (Content.get_content, Content.get_summary):
+                logger.debug(
+                    "%s keeps %d values (%d bytes)",
+                    method.func.__qualname__,
+                    *method.footprint(),
+                )
 
         articles_generator = next(
             g for g in generators if isinstance(g, ArticlesGenerator)
@@ -239,6 +294,8 @@ class Pelican:
         num_writers = len(writers)
 
         if num_writers == 0:
+            if self.settings["WRITER_WORKERS"] != 1:
+                return ParallelWriter(self.output_path, settings=self.settings)
             return Writer(self.output_path, settings=self.settings)
 
         if num_writers > 1:
@@ -439,6 +496,61 @@ def parse_arguments(argv=None):
         help="Ignore content cache from previous runs by not loading cache files.",
     )
 
+    parser.add_argument(
+        "--incremental",
+        action="store_true",
+        dest="incremental",
+        help=(
+            "Only write the output files whose content, templates or "
+            "settings changed since the previous incremental build."
+        ),
+    )
+
+    parser.add_argument(
+        "-j",
+        "--jobs",
+        dest="jobs",
+        type=int,
+        help=(
+            "Number of processes used to read content files. "
+            "0 means one per CPU. (default: 1)"
+        ),
+    )
+
+    parser.add_argument(
+        "--profile",
+        dest="profile",
+        nargs="?",
+        const="pelican-profile.json",
+        metavar="PROFILE_PATH",
+        help=(
+            "Print the time spent in each phase of the build and in reading "
+            "and rendering each file, and save it as JSON to PROFILE_PATH. "
+            '(default: "pelican-profile.json")'
+        ),
+    )
+
+    parser.add_argument(
+        "--trace",
+        dest="trace",
+        metavar="TRACE_PATH",
+        help=(
+            "Save a timeline of the build to TRACE_PATH, in the trace event "
+            "format used by trace viewers such as Perfetto."
+        ),
+    )
+
+    parser.add_argument(
+        "--cache-stats",
+        dest="cache_stats",
+        metavar="CACHE_STATS_PATH",
+        help=(
+            "Save the number of hits, misses and stale entries, the load and "
+            "save times and the size of each cache as JSON to "
+            "CACHE_STATS_PATH. They are printed in verbose mode."
+        ),
+    )
+
     parser.add_argument(
         "--fatal",
         metavar="errors|warnings",
@@ -532,6 +644,18 @@ def get_config(args):
         config["LOAD_CONTENT_CACHE"] = False
     if args.cache_path:
         config["CACHE_PATH"] = args.cache_path
+    if args.incremental:
+        config["INCREMENTAL_BUILD"] = True
+    if args.jobs is not None:
+        config["READER_WORKERS"] = args.jobs
+    if args.profile:
+        config["PROFILE_PATH"] = os.path.abspath(os.path.expanduser(args.profile))
+    if args.trace:
+        config["TRACE_PATH"] = os.path.abspath(os.path.expanduser(args.trace))
+    if args.cache_stats:
+        config["CACHE_STATS_PATH"] = os.path.abspath(
+            os.path.expanduser(args.cache_stats)
+        )
     if args.relative_paths:
         config["RELATIVE_URLS"] = args.relative_paths
     if args.port is not None:
@@ -1,35 +1,212 @@
 import gzip
 import hashlib
+import importlib.metadata
+import inspect
+import io
+import json
 import logging
 import os
 import pickle
+import sqlite3
+import sys
+import time
+import zlib
+from collections.abc import MutableMapping
+from types import ModuleType
 
-from pelican.utils import mkdir_p
+import pygments
+from rich.table import Table
+
+from pelican.contents import Content
+from pelican.plugins._utils import get_plugin_name
+from pelican.utils import maybe_pluralize, mkdir_p, posixize_path
 
 logger = logging.getLogger(__name__)
 
+# CHECK_MODIFIED_METHOD prefix of the methods checking the size and mtime of
+# the files before their hash
+HYBRID_PREFIX = "mtime+"
+
+# Settings which do not change the data that is cached
+UNFINGERPRINTED_SETTINGS = {
+    "AUTORELOAD_IGNORE_CACHE",
+    "BIND",
+    "CACHE_BACKEND",
+    "CACHE_STATS_PATH",
+    "CACHE_CONTENT",
+    "CACHE_PATH",
+    "DELETE_OUTPUT_DIRECTORY",
+    "GZIP_CACHE",
+    "INCREMENTAL_BUILD",
+    "JINJA_BYTECODE_CACHE",
+    "LOAD_CONTENT_CACHE",
+    "LOG_FILTER",
+    "OUTPUT_RETENTION",
+    "PORT",
+    "PROFILE_PATH",
+    "READER_WORKERS",
+    "TRACE_PATH",
+    "WRITER_WORKERS",
+    "WRITE_SELECTED",
+}
+
+
+def get_fingerprint(settings, keys=None):
+    """Return a digest of what cached data depends on besides the files:
+    the Pelican version, the enabled plugins and their version, and the
+    settings.
+
+    :param settings: the settings of the build.
+    :param keys: the settings to take into account, instead of all of them
+        but the ``UNFINGERPRINTED_SETTINGS``.
+    """
+    from pelican import __version__  # noqa: PLC0415
+
+    if keys is None:
+        keys = [key for key in settings if key not in UNFINGERPRINTED_SETTINGS]
+    roots = [
+        (os.path.dirname(os.path.abspath(settings.get("PATH", os.curdir))), "<site>"),
+        (os.path.dirname(os.path.abspath(__file__)), "<pelican>"),
+    ]
+    values = {key: _relocatable(settings.get(key), roots) for key in keys}
+    digest = hashlib.sha1(__version__.encode())
+    for plugin in settings.get("PLUGINS") or ():
+        digest.update(f"{_get_plugin_version(plugin)}\n".encode())
+    digest.update(_stable_repr(values).encode())
+    return digest.hexdigest()
+
+
+def _relocatable(value, roots):
+    """Replace the absolute paths under the given *roots* directories in
+    *value* by their path relative to the root, prefixed with its name, so
+    that the fingerprint of settings does not depend on where the site (or
+    Pelican) is.
+    """
+    if isinstance(value, str) and os.path.isabs(value):
+        for root, name in roots:
+            if value == root or value.startswith(root.rstrip(os.sep) + os.sep):
+                return name + "/" + posixize_path(os.path.relpath(value, root))
+    elif isinstance(value, dict):
+        value = {k: _relocatable(v, roots) for k, v in value.items()}
+    elif isinstance(value, (list, tuple)):
+        value = [_relocatable(v, roots) for v in value]
+    return value
+
+
+def _get_plugin_version(plugin):
+    """Return the name and version of a plugin, given as a module or a
+    name."""
+    name = plugin if isinstance(plugin, str) else get_plugin_name(plugin)
+    module = plugin if inspect.ismodule(plugin) else sys.modules.get(name)
+    version = getattr(module, "__version__", None)
+    if version is None and name.startswith("pelican.plugins."):
+        # namespace plugins are distributed as pelican-<name>
+        try:
+            version = importlib.metadata.version(
+                "pelican-" + name.rpartition(".")[2].replace("_", "-")
+            )
+        except importlib.metadata.PackageNotFoundError:
+            pass
+    return f"{name} {version}"
+
+
+def _dump(value, fhandle, shared):
+    """Pickle *value* to *fhandle*, pickling the values of the *shared*
+    dictionary by reference, by their key."""
+    ids = {id(obj): name for name, obj in shared.items()}
+    pickler = pickle.Pickler(fhandle, pickle.HIGHEST_PROTOCOL)
+    pickler.persistent_id = lambda obj: ids.get(id(obj))
+    pickler.dump(value)
+
+
+def _load(fhandle, shared):
+    """Unpickle a value pickled by _dump() from *fhandle*."""
+    unpickler = pickle.Unpickler(fhandle)
+    unpickler.persistent_load = shared.__getitem__
+    return unpickler.load()
+
+
+class CacheStats:
+    """Counters of the use of a cache by a build.
+
+    Each file is counted once, when it is first looked up: as a hit, a miss,
+    or as stale if it has an entry but was modified since.
+    """
+
+    def __init__(self, name, path):
+        self.name = name
+        self.path = path
+        self.hits = 0
+        self.misses = 0
+        self.stale = 0
+        # seconds spent loading and saving the cache, and its size in bytes
+        self.load_time = 0.0
+        self.save_time = 0.0
+        self.size = None
+
+    def count(self, outcome):
+        """Count a lookup as one of the ``hits``, ``misses`` or ``stale``"""
+        setattr(self, outcome, getattr(self, outcome) + 1)
+
+    def as_dict(self):
+        return dict(vars(self))
+
 
 class FileDataCacher:
     """Class that can cache data contained in files"""
 
-    def __init__(self, settings, cache_name, caching_policy, load_policy):
+    # The settings the cached data depends on, None meaning all of them but
+    # the UNFINGERPRINTED_SETTINGS
+    fingerprint_settings = None
+
+    def __init__(self, settings, cache_name, caching_policy, load_policy, shared=None):
         """Load the specified cache within CACHE_PATH in settings
 
         only if *load_policy* is True,
         May use gzip if GZIP_CACHE ins settings is True.
         Sets caching policy according to *caching_policy*.
+
+        The settings, and the values of the *shared* dictionary, are pickled
+        by reference rather than along with each entry, and replaced with
+        the current ones when the cache is loaded. A cache saved with other
+        relevant settings, plugins or Pelican version is discarded.
         """
         self.settings = settings
         self._cache_path = os.path.join(self.settings["CACHE_PATH"], cache_name)
         self._cache_data_policy = caching_policy
+        self._load_policy = load_policy
+        self.stats = CacheStats(cache_name, self._cache_path)
+        self._shared = {"settings": settings, **(shared or {})}
+        self._fingerprint = get_fingerprint(settings, self.fingerprint_settings)
+        # keys looked up or cached during this build, the others are evicted
+        self._used_keys = set()
         if self.settings["GZIP_CACHE"]:
             self._cache_open = gzip.open
         else:
             self._cache_open = open
-        if load_policy:
+        start = time.perf_counter()
+        if self.settings.get("CACHE_BACKEND") == "sqlite":
+            self.stats.path += ".sqlite"
+            self._cache = SQLiteCache(
+                self._cache_path + ".sqlite",
+                compress=self.settings["GZIP_CACHE"],
+                load=load_policy,
+                shared=self._shared,
+                fingerprint=self._fingerprint,
+            )
+        elif load_policy:
             try:
                 with self._cache_open(self._cache_path, "rb") as fhandle:
-                    self._cache = pickle.load(fhandle)
+                    # the entries are only unpickled if the fingerprint matches
+                    if _load(fhandle, self._shared) == self._fingerprint:
+                        self._cache = _load(fhandle, self._shared)
+                    else:
+                        logger.info(
+                            "Discarding cache %s, saved with other settings, "
+                            "plugins or Pelican version",
+                            self._cache_path,
+                        )
+                        self._cache = {}
             except (OSError, UnicodeDecodeError) as err:
                 logger.debug(
                     "Cannot load cache %s (this is normal on first "
@@ -50,9 +227,11 @@ class FileDataCacher:
                 self._cache = {}
         else:
             self._cache = {}
+        self.stats.load_time += time.perf_counter() - start
 
     def cache_data(self, filename, data):
         """Cache data for given file"""
+        self._used_keys.add(filename)
         if self._cache_data_policy:
             self._cache[filename] = data
 
@@ -61,68 +240,392 @@ class FileDataCacher:
 
         if no data is cached, return the default object
         """
-        return self._cache.get(filename, default)
+        first_lookup = filename not in self._used_keys
+        data, found = self._lookup(filename, default)
+        if first_lookup:
+            self.stats.count("hits" if found else "misses")
+        return data
+
+    def _lookup(self, filename, default):
+        """Return the cached data for the given file, or the default object,
+        and whether it was found, without counting the lookup"""
+        self._used_keys.add(filename)
+        try:
+            return self._cache[filename], True
+        except KeyError:
+            return default, False
+
+    def close(self):
+        """Release the resources held by the cache, when it is not saved"""
+        if isinstance(self._cache, SQLiteCache):
+            self._cache.close()
+
+    def is_enabled(self):
+        """Return True if the cache is loaded or saved by the build"""
+        return bool(self._cache_data_policy or self._load_policy)
+
+    def get_stats(self):
+        """Return the CacheStats of the cache"""
+        if isinstance(self._cache, SQLiteCache):
+            self.stats.load_time = self._cache.load_time
+        if os.path.exists(self.stats.path):
+            self.stats.size = os.path.getsize(self.stats.path)
+        return self.stats
 
     def save_cache(self):
-        """Save the updated cache"""
-        if self._cache_data_policy:
+        """Save the updated cache
+
+        The entries that were neither looked up nor cached during this build,
+        e.g. those of deleted or renamed files, are dropped.
+        """
+        if not self._cache_data_policy:
+            self.close()
+            return
+        start = time.perf_counter()
+        evicted = [key for key in self._cache if key not in self._used_keys]
+        for key in evicted:
+            del self._cache[key]
+        entries = len(self._cache)
+
+        if isinstance(self._cache, SQLiteCache):
+            saved = self._cache.save()
+        else:
             try:
                 mkdir_p(self.settings["CACHE_PATH"])
                 with self._cache_open(self._cache_path, "wb") as fhandle:
-                    pickle.dump(self._cache, fhandle)
+                    _dump(self._fingerprint, fhandle, {})
+                    _dump(self._cache, fhandle, self._shared)
+                saved = True
             except (OSError, pickle.PicklingError, TypeError) as err:
                 logger.warning(
                     "Could not save cache %s\n ... %s", self._cache_path, err
                 )
+                saved = False
+        self.stats.save_time += time.perf_counter() - start
+        if not saved:
+            return
+
+        path = self.stats.path
+        logger.info(
+            "Saved cache %s: %s, %s evicted, %s",
+            path,
+            maybe_pluralize(entries, "entry", "entries"),
+            len(evicted),
+            _format_size(os.path.getsize(path)),
+        )
+
+
+def report(cachers, settings, console):
+    """Print the statistics of the given caches in verbose mode, and save
+    them as JSON to ``CACHE_STATS_PATH`` if set."""
+    stats = [cacher.get_stats() for cacher in cachers if cacher.is_enabled()]
+    if not stats:
+        return
+
+    if logger.isEnabledFor(logging.INFO):
+        table = Table(
+            "Cache",
+            "Hits",
+            "Misses",
+            "Stale",
+            "Load (s)",
+            "Save (s)",
+            "Size",
+            title="Caches",
+        )
+        for entry in stats:
+            table.add_row(
+                entry.name,
+                str(entry.hits),
+                str(entry.misses),
+                str(entry.stale),
+                f"{entry.load_time:.3f}",
+                f"{entry.save_time:.3f}",
+                _format_size(entry.size) if entry.size is not None else "",
+            )
+        console.print(table)
+
+    path = settings.get("CACHE_STATS_PATH")
+    if path:
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with open(path, "w", encoding="utf-8") as fhandle:
+            json.dump([entry.as_dict() for entry in stats], fhandle, indent=2)
+        logger.info("Writing cache statistics to %s", path)
+
+
+def _format_size(size):
+    """Return a human readable file size."""
+    for unit in ("B", "KiB", "MiB"):
+        if size < 1024:  # noqa: PLR2004
+            return f"{size:.0f} {unit}" if unit == "B" else f"{size:.1f} {unit}"
+        size /= 1024
+    return f"{size:.1f} GiB"
+
+
+class SQLiteCache(MutableMapping):
+    """Cache entries stored in an SQLite database, one row per entry.
+
+    An entry is only read from the database and unpickled when it is first
+    accessed, and save() only writes the entries that were set or deleted.
+    Objects of *shared* (such as the settings, which content objects keep a
+    reference to) are pickled by name rather than once per entry, and the
+    given objects are used in their place when entries are unpickled.
+
+    :param path: the database file.
+    :param compress: compress the pickled entries with zlib.
+    :param load: use the entries saved by previous builds; if False, they
+        are deleted when saving.
+    :param shared: objects pickled by reference, by name.
+    :param fingerprint: the entries saved by previous builds are deleted
+        when saving, rather than used, if they were saved along with another
+        fingerprint.
+    """
+
+    def __init__(self, path, compress=False, load=True, shared=None, fingerprint=None):
+        self.path = path
+        self._compress = compress
+        self._shared = dict(shared or {})
+        self._fingerprint = fingerprint
+        self._clear = not load
+        self._connection = None
+        self._entries = {}
+        self._dirty = set()
+        self._deleted = set()
+        # seconds spent reading and unpickling entries
+        self.load_time = 0.0
+
+    def _connect(self, create=False):
+        if self._connection is None and (create or os.path.exists(self.path)):
+            if create:
+                mkdir_p(os.path.dirname(self.path))
+            self._connection = sqlite3.connect(self.path)
+            self._connection.execute(
+                "CREATE TABLE IF NOT EXISTS entries (key TEXT PRIMARY KEY, value BLOB)"
+            )
+            self._connection.execute(
+                "CREATE TABLE IF NOT EXISTS meta (name TEXT PRIMARY KEY, value TEXT)"
+            )
+            if self._fingerprint is not None and not self._clear:
+                rows = self._connection.execute(
+                    "SELECT value FROM meta WHERE name = 'fingerprint'"
+                ).fetchall()
+                stored = rows[0][0] if rows else None
+                if stored != self._fingerprint and self._has_entries():
+                    logger.info(
+                        "Discarding cache %s, saved with other settings, "
+                        "plugins or Pelican version",
+                        self.path,
+                    )
+                    self._clear = True
+        return self._connection
+
+    def _has_entries(self):
+        return bool(
+            self._connection.execute("SELECT 1 FROM entries LIMIT 1").fetchall()
+        )
+
+    def _dumps(self, value):
+        buffer = io.BytesIO()
+        _dump(value, buffer, self._shared)
+        data = buffer.getvalue()
+        return zlib.compress(data) if self._compress else data
+
+    def _loads(self, data):
+        if self._compress:
+            data = zlib.decompress(data)
+        return _load(io.BytesIO(data), self._shared)
+
+    def _query(self, sql, *params):
+        """Return the rows selected from the entries saved by previous
+        builds."""
+        if self._clear:
+            return []
+        try:
+            connection = self._connect()
+            if connection is None or self._clear:
+                return []
+            return connection.execute(sql, params).fetchall()
+        except sqlite3.Error as err:
+            logger.debug("Cannot read cache %s\n%s", self.path, err)
+            return []
+
+    def _is_stored(self, key):
+        return key not in self._deleted and bool(
+            self._query("SELECT 1 FROM entries WHERE key = ?", key)
+        )
+
+    def _read(self, key):
+        rows = []
+        if key not in self._deleted:
+            rows = self._query("SELECT value FROM entries WHERE key = ?", key)
+        if not rows:
+            raise KeyError(key)
+        try:
+            return self._loads(rows[0][0])
+        except Exception as err:
+            logger.debug(
+                "Cannot unpickle entry %s of cache %s\n%s", key, self.path, err
+            )
+            raise KeyError(key) from err
+
+    def __getitem__(self, key):
+        if key not in self._entries:
+            start = time.perf_counter()
+            try:
+                self._entries[key] = self._read(key)
+            finally:
+                self.load_time += time.perf_counter() - start
+        return self._entries[key]
+
+    def __setitem__(self, key, value):
+        self._entries[key] = value
+        self._dirty.add(key)
+        self._deleted.discard(key)
+
+    def __delitem__(self, key):
+        if key not in self._entries and not self._is_stored(key):
+            raise KeyError(key)
+        self._entries.pop(key, None)
+        self._dirty.discard(key)
+        self._deleted.add(key)
+
+    def _stored_keys(self):
+        return {key for (key,) in self._query("SELECT key FROM entries")}
+
+    def __iter__(self):
+        return iter((self._stored_keys() | set(self._entries)) - self._deleted)
+
+    def __len__(self):
+        return len((self._stored_keys() | set(self._entries)) - self._deleted)
+
+    def save(self):
+        """Write the entries set or deleted since the cache was loaded, and
+        return True if they were written successfully."""
+        try:
+            rows = [(key, self._dumps(self._entries[key])) for key in self._dirty]
+            connection = self._connect(create=True)
+            with connection:
+                if self._clear:
+                    connection.execute("DELETE FROM entries")
+                if self._fingerprint is not None:
+                    connection.execute(
+                        "INSERT OR REPLACE INTO meta (name, value) "
+                        "VALUES ('fingerprint', ?)",
+                        (self._fingerprint,),
+                    )
+                connection.executemany(
+                    "DELETE FROM entries WHERE key = ?",
+                    [(key,) for key in self._deleted],
+                )
+                connection.executemany(
+                    "INSERT OR REPLACE INTO entries (key, value) VALUES (?, ?)", rows
+                )
+        except (OSError, sqlite3.Error, pickle.PicklingError, TypeError) as err:
+            logger.warning("Could not save cache %s\n ... %s", self.path, err)
+            return False
+        finally:
+            self.close()
+        self._clear = False
+        self._dirty.clear()
+        self._deleted.clear()
+        return True
+
+    def close(self):
+        """Close the connection to the database, if open; it is opened again
+        if entries are read afterwards."""
+        if self._connection is not None:
+            self._connection.close()
+            self._connection = None
 
 
 class FileStampDataCacher(FileDataCacher):
     """Subclass that also caches the stamp of the file"""
 
-    def __init__(self, settings, cache_name, caching_policy, load_policy):
+    def __init__(self, settings, cache_name, caching_policy, load_policy, shared=None):
         """This subclass additionally sets filestamp function
         and base path for filestamping operations
         """
 
-        super().__init__(settings, cache_name, caching_policy, load_policy)
+        super().__init__(settings, cache_name, caching_policy, load_policy, shared)
 
+        # filename => stamp, each file is stamped once per build
+        self._file_stamps = {}
         method = self.settings["CHECK_MODIFIED_METHOD"]
+        self._hybrid = method.startswith(HYBRID_PREFIX)
         if method == "mtime":
-            self._filestamp_func = os.path.getmtime
-        else:
-            try:
-                hash_func = getattr(hashlib, method)
 
-                def filestamp_func(filename):
-                    """return hash of file contents"""
-                    with open(filename, "rb") as fhandle:
-                        return hash_func(fhandle.read()).digest()
+            def filestamp_func(filename, previous=None):
+                """return modification time of the file"""
+                return self._stat(filename).st_mtime
 
-                self._filestamp_func = filestamp_func
+            self._filestamp_func = filestamp_func
+        else:
+            try:
+                hash_func = getattr(hashlib, method.removeprefix(HYBRID_PREFIX))
             except AttributeError as err:
                 logger.warning("Could not get hashing function\n\t%s", err)
                 self._filestamp_func = None
+            else:
+                if self._hybrid:
+
+                    def filestamp_func(filename, previous=None):
+                        """return size, modification time and hash of the
+                        file, hashing it only if its size or modification
+                        time changed"""
+                        stat = self._stat(filename)
+                        if (
+                            isinstance(previous, tuple)
+                            and len(previous) == 3  # noqa: PLR2004
+                            and previous[:2] == (stat.st_size, stat.st_mtime_ns)
+                        ):
+                            return previous
+                        return (
+                            stat.st_size,
+                            stat.st_mtime_ns,
+                            _hash_file(filename, hash_func),
+                        )
+
+                else:
+
+                    def filestamp_func(filename, previous=None):
+                        """return hash of file contents"""
+                        return _hash_file(filename, hash_func)
+
+                self._filestamp_func = filestamp_func
+
+    def _stat(self, filename):
+        """Return the stat result of the given file"""
+        return os.stat(filename)
 
     def cache_data(self, filename, data):
         """Cache stamp and data for the given file"""
         stamp = self._get_file_stamp(filename)
         super().cache_data(filename, (stamp, data))
 
-    def _get_file_stamp(self, filename):
+    def _get_file_stamp(self, filename, previous=None):
         """Check if the given file has been modified
         since the previous build.
 
         depending on CHECK_MODIFIED_METHOD
         a float may be returned for 'mtime',
-        a hash for a function name in the hashlib module
+        a hash for a function name in the hashlib module,
+        a (size, mtime_ns, hash) tuple for 'mtime+' and such a name,
+        reusing the hash of the *previous* stamp if size and mtime match,
         or an empty bytes string otherwise
         """
 
-        try:
-            return self._filestamp_func(filename)
-        except (OSError, TypeError) as err:
-            logger.warning("Cannot get modification stamp for %s\n\t%s", filename, err)
-            return ""
+        if filename not in self._file_stamps:
+            try:
+                stamp = self._filestamp_func(filename, previous)
+            except (OSError, TypeError) as err:
+                logger.warning(
+                    "Cannot get modification stamp for %s\n\t%s", filename, err
+                )
+                stamp = ""
+            self._file_stamps[filename] = stamp
+        return self._file_stamps[filename]
 
     def get_cached_data(self, filename, default=None):
         """Get the cached data for the given filename
@@ -130,10 +633,266 @@ class FileStampDataCacher(FileDataCacher):
 
         If no record exists or file has been modified, return default.
         Modification is checked by comparing the cached
-        and current file stamp.
+        and current file stamp, or only their hash for 'mtime+' methods.
         """
 
-        stamp, data = super().get_cached_data(filename, (None, default))
-        if stamp != self._get_file_stamp(filename):
-            return default
-        return data
+        first_lookup = filename not in self._used_keys
+        (stamp, data), found = self._lookup(filename, (None, default))
+        current = self._get_file_stamp(filename, stamp)
+        if not found:
+            outcome = "misses"
+        elif stamp == current:
+            outcome = "hits"
+        elif self._hybrid and isinstance(stamp, tuple) and stamp[2:] == current[2:]:
+            # only the modification time changed, e.g. after a checkout:
+            # record it so that the file is not hashed again next time
+            FileDataCacher.cache_data(self, filename, (current, data))
+            outcome = "hits"
+        else:
+            outcome = "stale"
+        if first_lookup:
+            self.stats.count(outcome)
+        return data if outcome == "hits" else default
+
+
+def _hash_file(filename, hash_func, chunk_size=1 << 16):
+    """Return the digest of the contents of a file, read in chunks."""
+    digest = hash_func()
+    with open(filename, "rb") as fhandle:
+        while chunk := fhandle.read(chunk_size):
+            digest.update(chunk)
+    return digest.digest()
+
+
+def _stable_repr(value):
+    """Return a representation of *value* that is the same from one run to
+    the next, unlike repr() of functions, classes and other objects which
+    include their memory address.
+    """
+    if isinstance(value, dict):
+        items = sorted((_stable_repr(k), _stable_repr(v)) for k, v in value.items())
+        representation = "{" + ", ".join(f"{k}: {v}" for k, v in items) + "}"
+    elif isinstance(value, (list, tuple)):
+        representation = "[" + ", ".join(_stable_repr(v) for v in value) + "]"
+    elif isinstance(value, (set, frozenset)):
+        representation = "{" + ", ".join(sorted(_stable_repr(v) for v in value)) + "}"
+    elif isinstance(value, Content):
+        representation = f"<{type(value).__name__} {value.get_relative_source_path()}>"
+    elif callable(value) or isinstance(value, ModuleType):
+        name = getattr(value, "__qualname__", getattr(value, "__name__", ""))
+        representation = f"{getattr(value, '__module__', '')}.{name}"
+    else:
+        representation = repr(value)
+        if " at 0x" in representation:
+            representation = type(value).__name__
+    return representation
+
+
+class HighlightCache(FileDataCacher):
+    """Cache of the code blocks highlighted by Pygments, keyed on a digest of
+    the code, the lexer and the formatter with their options, so that the
+    code blocks of a modified file, or the same code in several files, are
+    not highlighted again.
+
+    Code blocks are only looked up when their file is read, not when it is
+    served by the content cache, so rather than being evicted by the first
+    build that did not use them, entries are kept for ``max_idle_builds``
+    builds after their last use.
+    """
+
+    # The highlighted code only depends on the Pygments version, part of
+    # the keys, and on the plugins, which may register lexers or styles
+    fingerprint_settings = ()
+    max_idle_builds = 50
+    _build_key = "build"
+
+    def __init__(self, settings):
+        super().__init__(
+            settings,
+            "highlight",
+            settings["CACHE_CONTENT"],
+            settings["LOAD_CONTENT_CACHE"],
+        )
+        # the build entry holds the number of the last build and the build
+        # each entry was last used by, so that idle entries are evicted by key
+        # without loading them
+        try:
+            build, self._last_used = self._cache[self._build_key]
+        except (KeyError, TypeError, ValueError):
+            build, self._last_used = -1, {}
+        self._build = build + 1
+
+    def highlight(self, code, lexer, formatter, outfile=None):
+        """Drop-in replacement of pygments.highlight() using the cache"""
+        if outfile is not None:
+            return pygments.highlight(code, lexer, formatter, outfile)
+        key = hashlib.sha1(
+            _stable_repr(
+                (
+                    pygments.__version__,
+                    code,
+                    type(lexer),
+                    lexer.options,
+                    type(formatter),
+                    formatter.options,
+                )
+            ).encode()
+        ).hexdigest()
+        highlighted = self.get_cached_data(key)
+        if highlighted is None or key not in self._last_used:
+            highlighted = pygments.highlight(code, lexer, formatter)
+            self.cache_data(key, highlighted)
+        self._last_used[key] = self._build
+        return highlighted
+
+    def save_cache(self):
+        """Save the updated cache, with the entries used by the last
+        ``max_idle_builds`` builds"""
+        if not self._cache_data_policy:
+            self.close()
+            return
+        oldest = self._build - self.max_idle_builds
+        self._last_used = {
+            key: build for key, build in self._last_used.items() if build >= oldest
+        }
+        self._used_keys.update(self._last_used)
+        self._cache[self._build_key] = (self._build, self._last_used)
+        self._used_keys.add(self._build_key)
+        super().save_cache()
+
+
+class BuildGraph(FileDataCacher):
+    """Record the inputs each output file was generated from, so that files
+    whose inputs did not change can be skipped by incremental builds.
+
+    An output file depends on:
+
+    - the settings and the Pelican version,
+    - the metadata of every content object (as they are used for menus,
+      listings and links),
+    - the templates of the theme,
+    - the body of the content objects it renders or lists (the ``article``
+      or ``page`` template variable, else the ``articles`` and ``dates``
+      ones, or the feed items).
+    """
+
+    dependency_keys = ("article", "page", "articles", "dates")
+
+    def __init__(self, settings):
+        super().__init__(settings, "BuildGraph", True, settings["LOAD_CONTENT_CACHE"])
+        self._site_digest = None
+        self._templates_digests = {}
+        self._content_digests = {}
+        self.rendered = []
+        self.skipped = []
+
+    def is_up_to_date(self, path, context, dependencies, template=None, extra=()):
+        """Return True if *path* exists and was generated from the very same
+        inputs by the previous build, then record its current inputs.
+
+        :param path: the output file.
+        :param context: the global context.
+        :param dependencies: the content objects whose body is rendered.
+        :param template: the template rendering the file, if any.
+        :param extra: other values the output depends on.
+        """
+        digest = hashlib.sha1(self._get_site_digest(context))
+        if template is not None:
+            digest.update(self._get_templates_digest(template))
+        digest.update(_stable_repr(extra).encode())
+        sources = []
+        for content in dependencies:
+            digest.update(self._get_content_digest(content))
+            sources.append(content.get_relative_source_path())
+        digest = digest.hexdigest()
+
+        key = posixize_path(os.path.relpath(path, self.settings["OUTPUT_PATH"]))
+        previous = self.get_cached_data(key)
+        if previous != (digest, sources):
+            self.cache_data(key, (digest, sources))
+        if previous is not None and previous[0] == digest and os.path.exists(path):
+            logger.debug("Skipping unchanged %s", path)
+            self.skipped.append(path)
+            return True
+        self.rendered.append(path)
+        return False
+
+    def get_dependencies(self, localcontext):
+        """Return the content objects rendered or listed by a template.
+
+        The file of an article or a page only depends on its own body, even
+        though the global ``articles`` and ``dates`` variables are available
+        to its template.
+        """
+        dependencies = [
+            localcontext[key]
+            for key in ("article", "page")
+            if isinstance(localcontext.get(key), Content)
+        ]
+        if dependencies:
+            return dependencies
+
+        dependencies = {}
+        for key in self.dependency_keys:
+            value = localcontext.get(key)
+            if isinstance(value, Content):
+                value = [value]
+            if isinstance(value, (list, tuple)):
+                for content in value:
+                    if isinstance(content, Content):
+                        dependencies[id(content)] = content
+        return list(dependencies.values())
+
+    def report(self):
+        return (
+            f"Incremental build: rendered {len(self.rendered)} and skipped "
+            f"{len(self.skipped)} unchanged output files."
+        )
+
+    def _get_site_digest(self, context):
+        if self._site_digest is None:
+            digest = hashlib.sha1(get_fingerprint(self.settings).encode())
+            for path, content in sorted(context.get("generated_content", {}).items()):
+                metadata = getattr(content, "metadata", None)
+                digest.update(f"{path}: {_stable_repr(metadata)}\n".encode())
+            for path in sorted(context.get("static_content", {})):
+                digest.update(f"{path}\n".encode())
+            self._site_digest = digest.digest()
+        return self._site_digest
+
+    def _get_templates_digest(self, template):
+        """Hash the templates that may be used by *template*: every template
+        its environment can load, and the template itself.
+        """
+        env = template.environment
+        if id(env) not in self._templates_digests:
+            digest = hashlib.sha1()
+            for dirpath in sorted(_get_loader_paths(env.loader)):
+                for root, dirs, files in os.walk(dirpath):
+                    dirs.sort()
+                    for name in sorted(files):
+                        with open(os.path.join(root, name), "rb") as fhandle:
+                            digest.update(name.encode())
+                            digest.update(fhandle.read())
+            self._templates_digests[id(env)] = digest.digest()
+        digest = hashlib.sha1(self._templates_digests[id(env)])
+        if template.filename and os.path.isfile(template.filename):
+            digest.update(template.name.encode())
+            digest.update(_hash_file(template.filename, hashlib.sha1))
+        return digest.digest()
+
+    def _get_content_digest(self, content):
+        if id(content) not in self._content_digests:
+            body = getattr(content, "_content", None) or ""
+            self._content_digests[id(content)] = hashlib.sha1(body.encode()).digest()
+        return self._content_digests[id(content)]
+
+
+def _get_loader_paths(loader):
+    """Return the directories templates can be loaded from by *loader*."""
+    paths = set(getattr(loader, "searchpath", ()))
+    for sub_loader in getattr(loader, "loaders", ()):
+        paths |= _get_loader_paths(sub_loader)
+    for sub_loader in getattr(loader, "mapping", {}).values():
+        paths |= _get_loader_paths(sub_loader)
+    return paths
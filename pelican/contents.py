@@ -1,12 +1,14 @@
+import bisect
 import copy
 import datetime
+import functools
 import locale
 import logging
 import os
 import re
-from html import unescape
-from typing import Any, Optional
-from urllib.parse import ParseResult, unquote, urljoin, urlparse, urlunparse
+import sys
+from typing import Any, Callable, Optional, Union
+from urllib.parse import urljoin, urlunparse
 
 try:
     from zoneinfo import ZoneInfo
@@ -14,13 +16,16 @@ except ModuleNotFoundError:
     from backports.zoneinfo import ZoneInfo
 
 
+from pelican.links import LinkIndex
 from pelican.plugins import signals
 from pelican.settings import DEFAULT_CONFIG, Settings
 
 # Import these so that they're available when you import from pelican.contents.
 from pelican.urlwrappers import Author, Category, Tag, URLWrapper  # NOQA
 from pelican.utils import (
+    close_html_truncation,
     deprecated_attribute,
+    find_html_truncation,
     memoized,
     path_to_url,
     posixize_path,
@@ -34,10 +39,109 @@ from pelican.utils import (
 logger = logging.getLogger(__name__)
 
 
+# Images with an empty alt attribute
+_empty_alt_re = re.compile(
+    r"""
+    (?:
+        # src before alt
+        <img
+        [^\>]*
+        src=(['"])(.*?)\1
+        [^\>]*
+        alt=(['"])\3
+    )|(?:
+        # alt before src
+        <img
+        [^\>]*
+        alt=(['"])\4
+        [^\>]*
+        src=(['"])(.*?)\5
+    )
+    """,
+    re.X,
+)
+
+
+@functools.cache
+def _compile_intrasite_link_regex(intrasite_link_regex: str) -> re.Pattern:
+    regex = rf"""
+        (?P<markup><[^\>]+  # match tag with all url-value attributes
+            (?:href|src|poster|data|cite|formaction|action|content)\s*=\s*)
+
+        (?P<quote>["\'])      # require value to be quoted
+        (?P<path>{intrasite_link_regex}(?P<value>.*?))  # the url value
+        (?P=quote)"""
+    return re.compile(regex, re.X)
+
+
+class _HTMLScan:
+    """What the scan of the HTML of a content found in it"""
+
+    __slots__ = ("empty_alt_images", "links", "rendered_links", "summary_cut")
+
+    def __init__(self, content: str, link_regex: re.Pattern) -> None:
+        content = content or ""
+        # the src of the images with an empty alt attribute
+        self.empty_alt_images = [
+            match[1] + match[5] for match in _empty_alt_re.findall(content)
+        ]
+        # the matches of the intrasite links
+        self.links = list(link_regex.finditer(content))
+        # siteurl => (offsets of the ends of the links in the content, in
+        # the content rendered for this siteurl)
+        self.rendered_links = {}
+        # the summary words and the result of find_html_truncation()
+        self.summary_cut = None
+
+
+class _FormatLater:
+    """The value of the formatted dates of a content until they are needed"""
+
+    def __reduce__(self) -> str:
+        # pickled as a reference to the single instance
+        return "_FORMAT_LATER"
+
+
+_FORMAT_LATER = _FormatLater()
+
+
+class _FormattedDate:
+    """A date of a content formatted with its date format, when it is first
+    needed rather than when the content is created."""
+
+    def __init__(self, date_attribute: str) -> None:
+        self.date_attribute = date_attribute
+
+    def __set_name__(self, owner: type, name: str) -> None:
+        self.name = name
+
+    def __get__(self, obj: Any, objtype: Optional[type] = None) -> Any:
+        if obj is None:
+            return self
+        try:
+            value = obj.__dict__[self.name]
+        except KeyError:
+            raise AttributeError(self.name) from None
+        if value is _FORMAT_LATER:
+            value = getattr(obj, self.date_attribute).strftime(obj.date_format)
+        return value
+
+    def __set__(self, obj: Any, value: Any) -> None:
+        obj.__dict__[self.name] = value
+
+    def __delete__(self, obj: Any) -> None:
+        try:
+            del obj.__dict__[self.name]
+        except KeyError:
+            raise AttributeError(self.name) from None
+
+
 class Content:
     """Represents a content.
 
-    :param content: the string to parse, containing the original content.
+    :param content: the string to parse, containing the original content, or
+        a callable returning it, which is called when the content is first
+        needed, e.g. to render it or its summary.
     :param metadata: the metadata associated to this page (optional).
     :param settings: the settings dictionary (optional).
     :param source_path: The location of the source of this content (if any).
@@ -45,16 +149,49 @@ class Content:
 
     """
 
+    # The attributes of every content, and the most common metadata, are kept
+    # in slots: the __dict__ of the instances only holds the other attributes
+    # set from their metadata.
+    __slots__ = (
+        "__dict__",
+        "__weakref__",
+        "_body",
+        "_context",
+        "_scan",
+        "_status",
+        "_summary",
+        "author",
+        "authors",
+        "category",
+        "date",
+        "date_format",
+        "in_default_lang",
+        "lang",
+        "metadata",
+        "relative_source_path",
+        "settings",
+        "slug",
+        "source_path",
+        "tags",
+        "template",
+        "timezone",
+        "title",
+        "translations",
+    )
+
     default_template: Optional[str] = None
     mandatory_properties: tuple[str, ...] = ()
 
+    locale_date = _FormattedDate("date")
+    locale_modified = _FormattedDate("modified")
+
     @deprecated_attribute(old="filename", new="source_path", since=(3, 2, 0))
     def filename():
         return None
 
     def __init__(
         self,
-        content: str,
+        content: Union[str, Callable[[], str]],
         metadata: Optional[dict[str, Any]] = None,
         settings: Optional[Settings] = None,
         source_path: Optional[str] = None,
@@ -72,8 +209,10 @@ class Content:
         self._context = context
         self.translations = []
 
-        local_metadata = {}
-        local_metadata.update(metadata)
+        # the keys of the metadata of every content are the same few strings
+        local_metadata = {
+            sys.intern(str(key)): value for key, value in metadata.items()
+        }
 
         # set metadata as attributes
         for key, value in local_metadata.items():
@@ -136,6 +275,18 @@ class Content:
             else:
                 self.date_format = settings["DEFAULT_DATE_FORMAT"]
 
+        # format the dates when they are first needed, unless the locale is
+        # switched for some contents: they would then be formatted with the
+        # locale of the content created last
+        format_later = not any(
+            isinstance(date_format, tuple)
+            for date_format in (
+                self.date_format,
+                settings["DEFAULT_DATE_FORMAT"],
+                *settings["DATE_FORMATS"].values(),
+            )
+        )
+
         if isinstance(self.date_format, tuple):
             locale_string = self.date_format[0]
             locale.setlocale(locale.LC_ALL, locale_string)
@@ -148,11 +299,17 @@ class Content:
 
         if hasattr(self, "date"):
             self.date = set_date_tzinfo(self.date, timezone)
-            self.locale_date = self.date.strftime(self.date_format)
+            self.locale_date = (
+                _FORMAT_LATER if format_later else self.date.strftime(self.date_format)
+            )
 
         if hasattr(self, "modified"):
             self.modified = set_date_tzinfo(self.modified, timezone)
-            self.locale_modified = self.modified.strftime(self.date_format)
+            self.locale_modified = (
+                _FORMAT_LATER
+                if format_later
+                else self.modified.strftime(self.date_format)
+            )
 
         # manage status
         if not hasattr(self, "status"):
@@ -168,6 +325,57 @@ class Content:
     def __str__(self) -> str:
         return self.source_path or repr(self)
 
+    @property
+    def _content(self) -> str:
+        body = self._body
+        if callable(body):
+            body = self._body = body()
+        return body
+
+    @_content.setter
+    def _content(self, value: Union[str, Callable[[], str]]) -> None:
+        self._body = value
+        self._scan = None
+        # forget what was rendered from the previous content
+        Content.get_content.invalidate(self)
+        Content.get_summary.invalidate(self)
+
+    def __getstate__(self) -> dict[str, Any]:
+        # a lazy body cannot be pickled, render it
+        self._content  # noqa: B018
+        # pickle the source path relative to PATH, so that content objects
+        # cached by a build can be used by a build in another directory
+        state = self.__dict__.copy()
+        for name in Content.__slots__:
+            if name in {"__dict__", "__weakref__"}:
+                continue
+            try:
+                state[name] = getattr(self, name)
+            except AttributeError:
+                pass
+        # the scan holds match objects, it is done again when needed
+        state["_scan"] = None
+        relative = state.get("relative_source_path")
+        if (
+            relative
+            and "PATH" in self.settings
+            and not relative.startswith("../")
+            and os.path.isabs(self.source_path)
+        ):
+            state["source_path"] = None
+        return state
+
+    def __setstate__(self, state: dict[str, Any]) -> None:
+        if "_content" in state:  # pickled by an older version
+            state["_body"] = state.pop("_content")
+            state["_scan"] = None
+        for name, value in state.items():
+            setattr(self, name, value)
+        if self.source_path is None and self.relative_source_path:
+            self.source_path = os.path.abspath(
+                os.path.join(self.settings["PATH"], self.relative_source_path)
+            )
+
     def _has_valid_mandatory_properties(self) -> bool:
         """Test mandatory properties are set."""
         for prop in self.mandatory_properties:
@@ -255,7 +463,7 @@ class Content:
 
     def _link_replacer(self, siteurl: str, m: re.Match) -> str:
         what = m.group("what")
-        value = urlparse(m.group("value"))
+        value = self.get_link_index().urlparse(m.group("value"))
         path = value.path
         origin = m.group("path")
 
@@ -280,57 +488,29 @@ class Content:
 
         # XXX Put this in a different location.
         if what in {"filename", "static", "attach"}:
+            links = self.get_link_index()
+            content_path = self.settings["PATH"]
+            key = "generated_content" if what == "filename" else "static_content"
+            linked_content, value = links.resolve(
+                self._context[key], m.group("value"), self.source_path, content_path
+            )
 
-            def _get_linked_content(key: str, url: ParseResult) -> Optional[Content]:
-                nonlocal value
-
-                def _find_path(path: str) -> Optional[Content]:
-                    if path.startswith("/"):
-                        path = path[1:]
-                    else:
-                        # relative to the source path of this content
-                        path = self.get_relative_source_path(  # type: ignore
-                            os.path.join(self.relative_dir, path)
-                        )
-                    return self._context[key].get(path, None)
-
-                # try path
-                result = _find_path(url.path)
-                if result is not None:
-                    return result
-
-                # try unquoted path
-                result = _find_path(unquote(url.path))
-                if result is not None:
-                    return result
-
-                # try html unescaped url
-                unescaped_url = urlparse(unescape(url.geturl()))
-                result = _find_path(unescaped_url.path)
-                if result is not None:
-                    value = unescaped_url
-                    return result
-
-                # check if a static file is linked with {filename}
-                if what == "filename" and key == "generated_content":
-                    linked_content = _get_linked_content("static_content", value)
-                    if linked_content:
-                        logger.warning(
-                            "{filename} used for linking to static"
-                            " content %s in %s. Use {static} instead",
-                            value.path,
-                            self.get_relative_source_path(),
-                        )
-                        return linked_content
-
-                return None
-
-            if what == "filename":
-                key = "generated_content"
-            else:
-                key = "static_content"
+            # check if a static file is linked with {filename}
+            if linked_content is None and what == "filename":
+                linked_content, value = links.resolve(
+                    self._context["static_content"],
+                    m.group("value"),
+                    self.source_path,
+                    content_path,
+                )
+                if linked_content:
+                    logger.warning(
+                        "{filename} used for linking to static"
+                        " content %s in %s. Use {static} instead",
+                        value.path,
+                        self.get_relative_source_path(),
+                    )
 
-            linked_content = _get_linked_content(key, value)
             if linked_content:
                 if what == "attach":
                     linked_content.attach_to(self)  # type: ignore
@@ -369,15 +549,24 @@ class Content:
         return "".join((m.group("markup"), m.group("quote"), origin, m.group("quote")))
 
     def _get_intrasite_link_regex(self) -> re.Pattern:
-        intrasite_link_regex = self.settings["INTRASITE_LINK_REGEX"]
-        regex = rf"""
-            (?P<markup><[^\>]+  # match tag with all url-value attributes
-                (?:href|src|poster|data|cite|formaction|action|content)\s*=\s*)
+        return _compile_intrasite_link_regex(self.settings["INTRASITE_LINK_REGEX"])
+
+    def get_link_index(self) -> LinkIndex:
+        """Return the index resolving the intrasite links, shared by the
+        contents of a build."""
+        return self._context.setdefault("link_index", LinkIndex())
+
+    def get_html_scan(self) -> _HTMLScan:
+        """Return the intrasite links and the images with an empty alt
+        attribute of the content, found when first needed and kept until the
+        content changes."""
+        if getattr(self, "_scan", None) is None:
+            self._scan = _HTMLScan(self._content, self._get_intrasite_link_regex())
+        return self._scan
 
-            (?P<quote>["\'])      # require value to be quoted
-            (?P<path>{intrasite_link_regex}(?P<value>.*?))  # the url value
-            (?P=quote)"""
-        return re.compile(regex, re.X)
+    def get_empty_alt_images(self) -> list[str]:
+        """Return the src of the images of the content with an empty alt"""
+        return self.get_html_scan().empty_alt_images
 
     def _update_content(self, content: str, siteurl: str) -> str:
         """Update the content attribute.
@@ -395,12 +584,36 @@ class Content:
         hrefs = self._get_intrasite_link_regex()
         return hrefs.sub(lambda m: self._link_replacer(siteurl, m), content)
 
+    def _render_content(self, siteurl: str) -> str:
+        """Update the links of the content, found by its scan, as
+        _update_content() does."""
+        content = self._content
+        if not content:
+            return content
+
+        scan = self.get_html_scan()
+        pieces = []
+        raw_ends = []
+        rendered_ends = []
+        last = 0
+        length = 0
+        for m in scan.links:
+            pieces.append(content[last : m.start()])
+            pieces.append(self._link_replacer(siteurl, m))
+            length += len(pieces[-2]) + len(pieces[-1])
+            last = m.end()
+            raw_ends.append(last)
+            rendered_ends.append(length)
+        pieces.append(content[last:])
+        scan.rendered_links[siteurl] = (raw_ends, rendered_ends)
+        return "".join(pieces)
+
     def get_static_links(self) -> set[str]:
         static_links = set()
-        hrefs = self._get_intrasite_link_regex()
-        for m in hrefs.finditer(self._content):
+        links = self.get_link_index()
+        for m in self.get_html_scan().links:
             what = m.group("what")
-            value = urlparse(m.group("value"))
+            value = links.urlparse(m.group("value"))
             path = value.path
             if what not in {"static", "attach"}:
                 continue
@@ -421,10 +634,8 @@ class Content:
     @memoized
     def get_content(self, siteurl: str) -> str:
         if hasattr(self, "_get_content"):
-            content = self._get_content()
-        else:
-            content = self._content
-        return self._update_content(content, siteurl)
+            return self._update_content(self._get_content(), siteurl)
+        return self._render_content(siteurl)
 
     @property
     def content(self) -> str:
@@ -440,6 +651,10 @@ class Content:
         if "summary" in self.metadata:
             return self.metadata["summary"]
 
+        summary = self._get_summary_from_scan()
+        if summary is not None:
+            return summary
+
         content = self.content
         max_paragraphs = self.settings.get("SUMMARY_MAX_PARAGRAPHS")
         if max_paragraphs is not None:
@@ -458,6 +673,43 @@ class Content:
     def summary(self) -> str:
         return self.get_summary(self.get_siteurl())
 
+    def _get_summary_from_scan(self) -> Optional[str]:
+        """Return the summary truncating the content to SUMMARY_MAX_LENGTH
+        words, at an offset found once in the content and shifted by the
+        updated links, or None if it has to be computed from the content."""
+        max_length = self.settings["SUMMARY_MAX_LENGTH"]
+        if (
+            max_length is None
+            or int(max_length) <= 0
+            or self.settings.get("SUMMARY_MAX_PARAGRAPHS") is not None
+            or hasattr(self, "_get_content")
+        ):
+            return None
+
+        siteurl = self.get_siteurl()
+        content = self.get_content(siteurl)
+        if not content:
+            return None
+        scan = self.get_html_scan()
+        if scan.summary_cut is None or scan.summary_cut[0] != max_length:
+            scan.summary_cut = (
+                max_length,
+                find_html_truncation(self._content, int(max_length)),
+            )
+        truncate_at, open_tags = scan.summary_cut[1]
+        if truncate_at is not None and scan.links:
+            if siteurl not in scan.rendered_links:
+                return None
+            raw_ends, rendered_ends = scan.rendered_links[siteurl]
+            index = bisect.bisect_right(raw_ends, truncate_at)
+            if index < len(scan.links) and scan.links[index].start() < truncate_at:
+                return None  # the words end within a link
+            if index:
+                truncate_at += rendered_ends[index - 1] - raw_ends[index - 1]
+        return close_html_truncation(
+            content, truncate_at, open_tags, self.settings["SUMMARY_END_SUFFIX"]
+        )
+
     def _get_summary(self) -> str:
         """deprecated function to access summary"""
 
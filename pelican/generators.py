@@ -1,6 +1,6 @@
 import calendar
 import errno
-import fnmatch
+import importlib.metadata
 import logging
 import os
 from collections import defaultdict
@@ -13,13 +13,16 @@ from jinja2 import (
     BaseLoader,
     ChoiceLoader,
     Environment,
+    FileSystemBytecodeCache,
     FileSystemLoader,
     PrefixLoader,
     TemplateNotFound,
 )
 
+from pelican import profiling
 from pelican.cache import FileStampDataCacher
 from pelican.contents import Article, Page, SkipStub, Static
+from pelican.inventory import ContentInventory
 from pelican.plugins import signals
 from pelican.plugins._utils import plugin_enabled
 from pelican.readers import Readers
@@ -39,36 +42,65 @@ class PelicanTemplateNotFound(Exception):
     pass
 
 
-class Generator:
-    """Baseclass generator"""
+def get_bytecode_cache(settings):
+    """Return the cache of the compiled templates, stored in CACHE_PATH, if
+    enabled by JINJA_BYTECODE_CACHE (by default, if CACHE_CONTENT is).
 
-    def __init__(
-        self,
-        context,
-        settings,
-        path,
-        theme,
-        output_path,
-        readers_cache_name="",
-        **kwargs,
-    ):
-        self.context = context
-        self.settings = settings
-        self.path = path
-        self.theme = theme
-        self.output_path = output_path
+    Templates are compiled again when their source changes, and when Jinja2
+    is upgraded, as each version uses its own directory.
+    """
+    enabled = settings.get("JINJA_BYTECODE_CACHE")
+    if enabled is None:
+        enabled = settings["CACHE_CONTENT"]
+    if not enabled:
+        return None
+    directory = os.path.join(
+        settings["CACHE_PATH"], "jinja2-" + importlib.metadata.version("jinja2")
+    )
+    try:
+        mkdir_p(directory)
+    except OSError as err:
+        logger.warning("Could not create template cache %s\n ... %s", directory, err)
+        return None
+    return FileSystemBytecodeCache(directory)
+
+
+def _select_in_order(ordered, groups):
+    """Return the items of each list of *groups* in the order of the list
+    *ordered*, that is ``[[item for item in ordered if item in items] for items
+    in groups]``, in a single pass over *ordered*.
+
+    Items are told apart by identity, as content objects compare.
+    """
+    # id of an item => indexes of the groups it belongs to
+    groups_of = defaultdict(dict)
+    for index, items in enumerate(groups):
+        for item in items:
+            groups_of[id(item)][index] = None
+    selections = [[] for _ in groups]
+    for item in ordered:
+        for index in groups_of.get(id(item), ()):
+            selections[index].append(item)
+    return selections
 
-        for arg, value in kwargs.items():
-            setattr(self, arg, value)
 
-        self.readers = Readers(self.settings, readers_cache_name)
+class TemplateRegistry:
+    """The Jinja2 environment loading the templates of the theme, and the
+    templates loaded by name, shared by the generators of a build.
 
-        # templates cache
+    A single registry is created by Pelican.run and stored in the context
+    as ``template_registry``.
+    """
+
+    def __init__(self, settings, theme):
+        self.settings = settings
+        self.theme = theme
+        # environment => {name: template}
         self._templates = {}
-        self._templates_path = list(self.settings["THEME_TEMPLATES_OVERRIDES"])
+        self.paths = list(self.settings["THEME_TEMPLATES_OVERRIDES"])
 
-        theme_templates_path = os.path.expanduser(os.path.join(self.theme, "templates"))
-        self._templates_path.append(theme_templates_path)
+        theme_templates_path = os.path.expanduser(os.path.join(theme, "templates"))
+        self.paths.append(theme_templates_path)
         theme_loader = FileSystemLoader(theme_templates_path)
 
         simple_theme_path = os.path.dirname(os.path.abspath(__file__))
@@ -76,20 +108,25 @@ class Generator:
             os.path.join(simple_theme_path, "themes", "simple", "templates")
         )
 
+        environment_settings = dict(self.settings["JINJA_ENVIRONMENT"])
+        environment_settings.setdefault(
+            "bytecode_cache", get_bytecode_cache(self.settings)
+        )
         self.env = Environment(
             loader=ChoiceLoader(
                 [
-                    FileSystemLoader(self._templates_path),
+                    FileSystemLoader(self.paths),
                     simple_loader,  # implicit inheritance
                     PrefixLoader(
                         {"!simple": simple_loader, "!theme": theme_loader}
                     ),  # explicit ones
                 ]
             ),
-            **self.settings["JINJA_ENVIRONMENT"],
+            **environment_settings,
         )
 
-        logger.debug("Template list: %s", self.env.list_templates())
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("Template list: %s", self.env.list_templates())
 
         # provide utils.strftime as a jinja filter
         self.env.filters.update({"strftime": DateFormatter()})
@@ -109,31 +146,84 @@ class Generator:
         )
         self.env.tests.update(custom_tests)
 
-        signals.generator_init.send(self)
-
-    def get_template(self, name):
-        """Return the template by name.
-        Use self.theme to get the templates to use, and return a list of
-        templates ready to use with Jinja2.
-        """
-        if name not in self._templates:
+    def __reduce__(self):
+        # content objects keep a reference to the context, hence to the
+        # registry: create the environment again rather than pickling it
+        return (type(self), (self.settings, self.theme))
+
+    def get_template(self, name, env=None):
+        """Return the template by name, trying each of the
+        TEMPLATE_EXTENSIONS, loaded by *env* (by default, the environment
+        of the registry)."""
+        env = env or self.env
+        templates = self._templates.setdefault(env, {})
+        if name not in templates:
             for ext in self.settings["TEMPLATE_EXTENSIONS"]:
                 try:
-                    self._templates[name] = self.env.get_template(name + ext)
+                    templates[name] = env.get_template(name + ext)
                     break
                 except TemplateNotFound:
                     continue
 
-            if name not in self._templates:
+            if name not in templates:
                 raise PelicanTemplateNotFound(
                     "[templates] unable to load {}[{}] from {}".format(
                         name,
                         ", ".join(self.settings["TEMPLATE_EXTENSIONS"]),
-                        self._templates_path,
+                        self.paths,
                     )
                 )
 
-        return self._templates[name]
+        return templates[name]
+
+
+class Generator:
+    """Baseclass generator"""
+
+    def __init__(
+        self,
+        context,
+        settings,
+        path,
+        theme,
+        output_path,
+        readers_cache_name="",
+        **kwargs,
+    ):
+        self.context = context
+        self.settings = settings
+        self.path = path
+        self.theme = theme
+        self.output_path = output_path
+
+        for arg, value in kwargs.items():
+            setattr(self, arg, value)
+
+        self.inventory = context.setdefault("content_inventory", ContentInventory())
+        # the reader objects are shared by the generators of a build, each
+        # generator having its own reader-level cache
+        shared_readers = context.get("readers")
+        if shared_readers is None:
+            self.readers = Readers(self.settings, readers_cache_name)
+        else:
+            self.readers = shared_readers.partition(readers_cache_name)
+
+        # the templates are shared by the generators of a build, unless
+        # a generator replaces its env
+        self.template_registry = context.get("template_registry")
+        if self.template_registry is None:
+            self.template_registry = TemplateRegistry(self.settings, self.theme)
+        self.env = self.template_registry.env
+        self._templates_path = self.template_registry.paths
+
+        signals.generator_init.send(self)
+
+    def get_template(self, name):
+        """Return the template by name.
+        Use self.theme to get the templates to use, and return a list of
+        templates ready to use with Jinja2.
+        """
+        return self.template_registry.get_template(name, self.env)
 
     def _include_path(self, path, extensions=None):
         """Inclusion logic for .get_files(), returns True/False
@@ -147,8 +237,7 @@ class Generator:
         basename = os.path.basename(path)
 
         # check IGNORE_FILES
-        ignores = self.settings["IGNORE_FILES"]
-        if any(fnmatch.fnmatch(basename, ignore) for ignore in ignores):
+        if self.inventory.is_ignored(basename, self.settings["IGNORE_FILES"]):
             return False
 
         ext = os.path.splitext(basename)[1][1:]
@@ -186,18 +275,9 @@ class Generator:
             root = os.path.join(self.path, path) if path else self.path
 
             if os.path.isdir(root):
-                for dirpath, dirs, temp_files in os.walk(
-                    root, topdown=True, followlinks=True
+                for dirpath, temp_files in self.inventory.walk(
+                    root, exclusions_by_dirpath, ignores
                 ):
-                    excl = exclusions_by_dirpath.get(dirpath, ())
-                    # We copy the `dirs` list as we will modify it in the loop:
-                    for d in list(dirs):
-                        if d in excl or any(
-                            fnmatch.fnmatch(d, ignore) for ignore in ignores
-                        ):
-                            if d in dirs:
-                                dirs.remove(d)
-
                     reldir = os.path.relpath(dirpath, self.path)
                     for f in temp_files:
                         fp = os.path.join(reldir, f)
@@ -280,14 +360,42 @@ class CachingGenerator(Generator, FileStampDataCacher):
         cache_this_level = self.settings["CONTENT_CACHING_LAYER"] == "generator"
         caching_policy = cache_this_level and self.settings["CACHE_CONTENT"]
         load_policy = cache_this_level and self.settings["LOAD_CONTENT_CACHE"]
+        # cached content objects keep a reference to the context
         FileStampDataCacher.__init__(
-            self, self.settings, cls_name, caching_policy, load_policy
+            self,
+            self.settings,
+            cls_name,
+            caching_policy,
+            load_policy,
+            shared={"context": self.context},
         )
 
-    def _get_file_stamp(self, filename):
+    def _get_file_stamp(self, filename, previous=None):
         """Get filestamp for path relative to generator.path"""
         filename = os.path.join(self.path, filename)
-        return super()._get_file_stamp(filename)
+        return super()._get_file_stamp(filename, previous)
+
+    def _stat(self, filename):
+        """Get the stat result from the listing of the content directories"""
+        return self.inventory.stat(filename)
+
+    def _prefetch_files(self, files, preread_signal):
+        """Have the readers parse the files missing from the cache in
+        parallel, if enabled by READER_WORKERS.
+
+        Files are read serially if *preread_signal* has receivers, as they
+        may change the settings, the readers or the files before reading.
+        """
+        workers = self.settings["READER_WORKERS"]
+        if workers == 1:
+            return
+        if preread_signal.receivers:
+            logger.debug(
+                "Reading files serially: %s has receivers", preread_signal.name
+            )
+            return
+        uncached = [f for f in files if self.get_cached_data(f, None) is None]
+        self.readers.prefetch(self.path, uncached, workers)
 
 
 class _FileLoader(BaseLoader):
@@ -341,6 +449,7 @@ class ArticlesGenerator(CachingGenerator):
         super().__init__(*args, **kwargs)
         signals.article_generator_init.send(self)
 
+    @profiling.traced("generator")
     def generate_feeds(self, writer):
         """Generate the feeds from the current context, and output files."""
 
@@ -498,6 +607,7 @@ class ArticlesGenerator(CachingGenerator):
                         feed_type="rss",
                     )
 
+    @profiling.traced("generator")
     def generate_articles(self, write):
         """Generate the articles."""
         for article in chain(
@@ -518,6 +628,7 @@ class ArticlesGenerator(CachingGenerator):
                 blog=True,
             )
 
+    @profiling.traced("generator")
     def generate_period_archives(self, write):
         """Generate per-year, per-month, and per-day archives."""
         try:
@@ -543,6 +654,7 @@ class ArticlesGenerator(CachingGenerator):
                     all_articles=self.articles,
                 )
 
+    @profiling.traced("generator")
     def generate_direct_templates(self, write):
         """Generate direct templates pages"""
         for template in self.settings["DIRECT_TEMPLATES"]:
@@ -565,11 +677,13 @@ class ArticlesGenerator(CachingGenerator):
                 url=url,
             )
 
+    @profiling.traced("generator")
     def generate_tags(self, write):
         """Generate Tags pages."""
         tag_template = self.get_template("tag")
-        for tag, articles in self.tags.items():
-            dates = [article for article in self.dates if article in articles]
+        tags = list(self.tags.items())
+        all_dates = _select_in_order(self.dates, [articles for _, articles in tags])
+        for (tag, articles), dates in zip(tags, all_dates):
             write(
                 tag.save_as,
                 tag_template,
@@ -584,11 +698,15 @@ class ArticlesGenerator(CachingGenerator):
                 all_articles=self.articles,
             )
 
+    @profiling.traced("generator")
     def generate_categories(self, write):
         """Generate category pages."""
         category_template = self.get_template("category")
-        for cat, articles in self.categories:
-            dates = [article for article in self.dates if article in articles]
+        categories = list(self.categories)
+        all_dates = _select_in_order(
+            self.dates, [articles for _, articles in categories]
+        )
+        for (cat, articles), dates in zip(categories, all_dates):
             write(
                 cat.save_as,
                 category_template,
@@ -603,11 +721,13 @@ class ArticlesGenerator(CachingGenerator):
                 all_articles=self.articles,
             )
 
+    @profiling.traced("generator")
     def generate_authors(self, write):
         """Generate Author pages."""
         author_template = self.get_template("author")
-        for aut, articles in self.authors:
-            dates = [article for article in self.dates if article in articles]
+        authors = list(self.authors)
+        all_dates = _select_in_order(self.dates, [articles for _, articles in authors])
+        for (aut, articles), dates in zip(authors, all_dates):
             write(
                 aut.save_as,
                 author_template,
@@ -622,6 +742,7 @@ class ArticlesGenerator(CachingGenerator):
                 all_articles=self.articles,
             )
 
+    @profiling.traced("generator")
     def generate_drafts(self, write):
         """Generate drafts pages."""
         for draft in chain(self.drafts_translations, self.drafts):
@@ -637,6 +758,7 @@ class ArticlesGenerator(CachingGenerator):
                 url=draft.url,
             )
 
+    @profiling.traced("generator")
     def generate_pages(self, writer):
         """Generate the pages on the disk"""
         write = partial(writer.write_file, relative_urls=self.settings["RELATIVE_URLS"])
@@ -664,9 +786,14 @@ class ArticlesGenerator(CachingGenerator):
         all_articles = []
         all_drafts = []
         hidden_articles = []
-        for f in self.get_files(
-            self.settings["ARTICLE_PATHS"], exclude=self.settings["ARTICLE_EXCLUDES"]
-        ):
+        files = sorted(
+            self.get_files(
+                self.settings["ARTICLE_PATHS"],
+                exclude=self.settings["ARTICLE_EXCLUDES"],
+            )
+        )
+        self._prefetch_files(files, signals.article_generator_preread)
+        for f in files:
             article = self.get_cached_data(f, None)
             if article is None:
                 try:
@@ -815,7 +942,6 @@ class ArticlesGenerator(CachingGenerator):
 
                 dates = list(group)
                 archive["dates"] = dates
-                archive["articles"] = [a for a in articles if a in dates]
 
                 # use the first date to specify the period archive URL
                 # and save_as; the specific date used does not matter as
@@ -837,11 +963,20 @@ class ArticlesGenerator(CachingGenerator):
 
                 period_archives[granularity].append(archive)
 
+        archives = list(chain.from_iterable(period_archives.values()))
+        all_articles = _select_in_order(
+            articles, [archive["dates"] for archive in archives]
+        )
+        for archive, period_articles in zip(archives, all_articles):
+            archive["articles"] = period_articles
+
         return period_archives
 
     def generate_output(self, writer):
         self.generate_feeds(writer)
         self.generate_pages(writer)
+        if hasattr(writer, "flush"):
+            writer.flush()
         signals.article_writer_finalized.send(self, writer=writer)
 
     def refresh_metadata_intersite_links(self):
@@ -879,9 +1014,13 @@ class PagesGenerator(CachingGenerator):
         all_pages = []
         hidden_pages = []
         draft_pages = []
-        for f in self.get_files(
-            self.settings["PAGE_PATHS"], exclude=self.settings["PAGE_EXCLUDES"]
-        ):
+        files = sorted(
+            self.get_files(
+                self.settings["PAGE_PATHS"], exclude=self.settings["PAGE_EXCLUDES"]
+            )
+        )
+        self._prefetch_files(files, signals.page_generator_preread)
+        for f in files:
             page = self.get_cached_data(f, None)
             if page is None:
                 try:
@@ -963,6 +1102,8 @@ class PagesGenerator(CachingGenerator):
                 override_output=hasattr(page, "override_save_as"),
                 url=page.url,
             )
+        if hasattr(writer, "flush"):
+            writer.flush()
         signals.page_writer_finalized.send(self, writer=writer)
 
     def refresh_metadata_intersite_links(self):
@@ -1076,7 +1217,7 @@ class StaticGenerator(Generator):
     def _source_is_newer(self, staticfile):
         source_path = os.path.join(self.path, staticfile.source_path)
         save_as = os.path.join(self.output_path, staticfile.save_as)
-        s_mtime = os.path.getmtime(source_path)
+        s_mtime = self.inventory.stat(source_path).st_mtime
         d_mtime = os.path.getmtime(save_as)
         return s_mtime - d_mtime > 0.000001  # noqa: PLR2004
 
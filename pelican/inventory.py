@@ -0,0 +1,100 @@
+import fnmatch
+import logging
+import os
+import re
+
+logger = logging.getLogger(__name__)
+
+
+class ContentInventory:
+    """Listing of the directories of the content tree, shared by generators.
+
+    Each directory is read with os.scandir() at most once per build, when a
+    generator first looks for files in it, so that the generators (and the
+    checks for files of disabled readers) do not walk the same trees again.
+    The stat results of the listed files are kept along with them.
+
+    A single inventory is created by Pelican.run and stored in the context
+    as ``content_inventory``.
+    """
+
+    def __init__(self):
+        # directory => (names of the subdirectories, {file name: DirEntry})
+        self._listings = {}
+        # normalized absolute path => DirEntry of the listed files
+        self._entries = {}
+        self._ignore_matchers = {}
+
+    def __getstate__(self):
+        # content objects keep a reference to the context, hence to the
+        # inventory: do not store the listings in the content caches
+        return {}
+
+    def __setstate__(self, state):
+        self.__init__()
+
+    def listdir(self, dirpath):
+        """Return the names of the subdirectories of *dirpath*, and the
+        DirEntry of its files by name."""
+        if dirpath not in self._listings:
+            dirs, files = [], {}
+            try:
+                with os.scandir(dirpath) as entries:
+                    for entry in entries:
+                        try:
+                            is_dir = entry.is_dir()
+                        except OSError:
+                            is_dir = False
+                        if is_dir:
+                            dirs.append(entry.name)
+                        else:
+                            files[entry.name] = entry
+                            path = os.path.normpath(os.path.abspath(entry.path))
+                            self._entries[path] = entry
+            except OSError as err:
+                logger.debug("Cannot list %s\n%s", dirpath, err)
+            self._listings[dirpath] = (dirs, files)
+        return self._listings[dirpath]
+
+    def is_ignored(self, name, ignores):
+        """Return True if *name* matches one of the *ignores* patterns, as
+        fnmatch.fnmatch() would."""
+        key = frozenset(ignores)
+        if key not in self._ignore_matchers:
+            if key:
+                pattern = "|".join(
+                    fnmatch.translate(os.path.normcase(ignore)) for ignore in key
+                )
+                self._ignore_matchers[key] = re.compile(pattern).match
+            else:
+                self._ignore_matchers[key] = lambda name: None
+        return self._ignore_matchers[key](os.path.normcase(name)) is not None
+
+    def walk(self, root, exclusions_by_dirpath, ignores):
+        """Yield the directories under *root* along with the names of their
+        files, as os.walk(root, followlinks=True) would, skipping the
+        subdirectories whose name is in ``exclusions_by_dirpath[dirpath]``
+        or matches one of the *ignores* patterns.
+        """
+        stack = [root]
+        while stack:
+            dirpath = stack.pop()
+            dirs, files = self.listdir(dirpath)
+            yield dirpath, list(files)
+            excl = exclusions_by_dirpath.get(dirpath, ())
+            stack.extend(
+                os.path.join(dirpath, d)
+                for d in reversed(dirs)
+                if d not in excl and not self.is_ignored(d, ignores)
+            )
+
+    def stat(self, path):
+        """Return the stat result of *path*, from the listing of its
+        directory if it was listed."""
+        entry = self._entries.get(os.path.normpath(os.path.abspath(path)))
+        if entry is not None:
+            try:
+                return entry.stat()
+            except OSError:
+                pass
+        return os.stat(path)
@@ -0,0 +1,96 @@
+import os
+from html import unescape
+from urllib.parse import unquote, urlparse
+
+from pelican.utils import posixize_path
+
+
+class LinkIndex:
+    """Resolution of the intrasite links of the contents of a build.
+
+    Contents link to other contents and to static files by their source path,
+    relative to the content path or to the directory of the linking content,
+    and possibly quoted or HTML escaped. The first time a link value is found
+    in a directory, it is parsed and the source paths it may stand for are
+    worked out; any later link with the same value only costs lookups in the
+    ``generated_content`` or ``static_content`` entries of the context.
+
+    A single index is created by Pelican.run and stored in the context as
+    ``link_index``.
+    """
+
+    def __init__(self):
+        # link value => its ParseResult
+        self._urls = {}
+        # (link value, directory of the linking content, content path) =>
+        # ((source path, ParseResult to keep the other parts from), ...)
+        self._candidates = {}
+
+    def __getstate__(self):
+        # content objects keep a reference to the context, hence to the
+        # index: do not store the resolutions in the content caches
+        return {}
+
+    def __setstate__(self, state):
+        self.__init__()
+
+    def urlparse(self, value):
+        """Return urllib.parse.urlparse(value), parsing each value once."""
+        url = self._urls.get(value)
+        if url is None:
+            url = self._urls[value] = urlparse(value)
+        return url
+
+    def resolve(self, contents, value, source_path, content_path):
+        """Return the content linked to by *value* and the parsed url to
+        keep the query, fragment, etc. from, or None and the parsed value.
+
+        :param contents: maps the source paths, relative to *content_path*,
+            to Content objects or None.
+        :param value: the link, without its ``{filename}``-like prefix.
+        :param source_path: the source path of the linking content, which
+            relative links are relative to.
+        :param content_path: the PATH setting.
+        """
+        key = (value, source_path and os.path.dirname(source_path), content_path)
+        candidates = self._candidates.get(key)
+        if candidates is None:
+            candidates = self._candidates[key] = self._find_candidates(*key)
+        for path, url in candidates:
+            content = contents.get(path)
+            if content is not None:
+                return content, url
+        return None, self.urlparse(value)
+
+    def _find_candidates(self, value, source_dir, content_path):
+        url = self.urlparse(value)
+        unescaped_url = urlparse(unescape(url.geturl()))
+        candidates = []
+        # try the path, the unquoted path and the html unescaped url
+        for path, candidate_url in (
+            (url.path, url),
+            (unquote(url.path), url),
+            (unescaped_url.path, unescaped_url),
+        ):
+            if path.startswith("/"):
+                path = path[1:]
+            else:
+                path = self._relative_source_path(path, source_dir, content_path)
+            if all(path != known for known, _ in candidates):
+                candidates.append((path, candidate_url))
+        return tuple(candidates)
+
+    @staticmethod
+    def _relative_source_path(path, source_dir, content_path):
+        # as Content.get_relative_source_path(
+        #     os.path.join(Content.relative_dir, path))
+        content_path = os.path.abspath(content_path)
+        relative_dir = posixize_path(
+            os.path.relpath(os.path.abspath(source_dir), content_path)
+        )
+        return posixize_path(
+            os.path.relpath(
+                os.path.abspath(os.path.join(content_path, relative_dir, path)),
+                content_path,
+            )
+        )
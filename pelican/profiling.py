@@ -0,0 +1,372 @@
+"""Measure where the time of a build is spent.
+
+A BuildProfiler is started by Pelican.run when the ``PROFILE_PATH`` setting
+(or the ``--profile`` command-line option) is set, and a BuildTracer when
+the ``TRACE_PATH`` setting (or the ``--trace`` command-line option) is set.
+The module level functions record to the running profiler and tracer, if
+any, and do nothing otherwise.
+"""
+
+import json
+import logging
+import os
+import time
+from collections import defaultdict
+from contextlib import contextmanager
+from functools import partial, wraps
+from inspect import signature
+
+from blinker import Signal
+from rich.table import Table
+
+from pelican.plugins import signals
+
+__all__ = [
+    "BuildProfiler",
+    "BuildTracer",
+    "Timer",
+    "phase",
+    "record_read",
+    "record_render",
+    "span",
+    "start",
+    "stop",
+    "traced",
+]
+
+logger = logging.getLogger(__name__)
+
+_profiler = None
+_tracer = None
+
+
+class Timer:
+    """Measure the wall-clock and CPU time spent in ``with`` blocks; the
+    time of each block is added to the previous ones."""
+
+    def __init__(self):
+        self.wall = self.cpu = 0.0
+        self.start = None
+        self.pid = None
+
+    def __enter__(self):
+        self._wall_start = time.perf_counter()
+        self._cpu_start = time.process_time()
+        if self.start is None:
+            self.start = self._wall_start
+            self.pid = os.getpid()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.wall += time.perf_counter() - self._wall_start
+        self.cpu += time.process_time() - self._cpu_start
+
+
+class BuildProfiler:
+    """Collect the time spent in each phase of a build, in reading each
+    source file and in rendering each output file.
+
+    Files read or rendered in worker processes are timed in the worker, so
+    their CPU time is not part of the CPU time of the phase they belong to.
+    """
+
+    slowest = 10
+
+    def __init__(self):
+        self.phases = []
+        self.files = []
+
+    def phase(self, name, generator=None):
+        """Return a context manager timing a phase of the build.
+
+        :param name: the name of the phase.
+        :param generator: the generator (or its class) running the phase.
+        """
+        if generator is not None and not isinstance(generator, type):
+            generator = type(generator)
+        timer = Timer()
+        self.phases.append(
+            {
+                "phase": name,
+                "generator": generator and generator.__name__,
+                "timer": timer,
+            }
+        )
+        return timer
+
+    def record(self, kind, path, by, timer):
+        """Record the time spent reading or rendering a file.
+
+        :param kind: ``"read"`` or ``"render"``.
+        :param path: the source or output file, relative to its directory.
+        :param by: the reader class or template name.
+        :param timer: the Timer of the operation.
+        """
+        self.files.append({"kind": kind, "path": path, "by": by, "timer": timer})
+
+    def as_dict(self):
+        def totals(kind):
+            result = defaultdict(lambda: {"files": 0, "wall": 0.0, "cpu": 0.0})
+            for entry in self.files:
+                if entry["kind"] == kind:
+                    total = result[entry["by"]]
+                    total["files"] += 1
+                    total["wall"] += entry["timer"].wall
+                    total["cpu"] += entry["timer"].cpu
+            return dict(result)
+
+        def timed(entry):
+            timer = entry["timer"]
+            return {
+                **{k: v for k, v in entry.items() if k != "timer"},
+                "wall": timer.wall,
+                "cpu": timer.cpu,
+            }
+
+        files = [timed(entry) for entry in self.files]
+        return {
+            "phases": [timed(entry) for entry in self.phases],
+            "readers": totals("read"),
+            "templates": totals("render"),
+            "slowest": sorted(files, key=lambda f: f["wall"], reverse=True)[
+                : self.slowest
+            ],
+            "files": files,
+        }
+
+    def save(self, path):
+        """Write the profile to *path* as JSON."""
+        with open(path, "w", encoding="utf-8") as fhandle:
+            json.dump(self.as_dict(), fhandle, indent=2)
+        logger.info("Writing profile to %s", path)
+
+    def tables(self):
+        """Return the profile as tables for the console."""
+        profile = self.as_dict()
+
+        phases = Table("Phase", "Generator", "Wall (s)", "CPU (s)", title="Phases")
+        for entry in profile["phases"]:
+            phases.add_row(
+                entry["phase"],
+                entry["generator"] or "",
+                f"{entry['wall']:.3f}",
+                f"{entry['cpu']:.3f}",
+            )
+
+        totals = Table(
+            "Reader / template", "Files", "Wall (s)", "CPU (s)", title="Files"
+        )
+        for kind in ("readers", "templates"):
+            for name, total in sorted(profile[kind].items()):
+                totals.add_row(
+                    name,
+                    str(total["files"]),
+                    f"{total['wall']:.3f}",
+                    f"{total['cpu']:.3f}",
+                )
+
+        slowest = Table(
+            "File", "Reader / template", "Wall (s)", "CPU (s)", title="Slowest files"
+        )
+        for entry in profile["slowest"]:
+            slowest.add_row(
+                entry["path"],
+                entry["by"],
+                f"{entry['wall']:.3f}",
+                f"{entry['cpu']:.3f}",
+            )
+
+        return phases, totals, slowest
+
+
+class BuildTracer:
+    """Record a timeline of the build in the Trace Event Format, which can be
+    loaded in trace viewers such as Perfetto or chrome://tracing.
+
+    Spans of the main process are on its own track, while the files read or
+    rendered by worker processes are on one track per worker.
+    """
+
+    def __init__(self):
+        self.events = []
+        self.pid = os.getpid()
+        self._origin = time.perf_counter()
+        self._tracks = {self.pid: "main"}
+
+    @contextmanager
+    def span(self, name, category, args=None):
+        """Record the ``with`` block as a span of the main process."""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add(name, category, start, time.perf_counter() - start, args=args)
+
+    def add(self, name, category, start, duration, tid=None, args=None):
+        """Add a span starting at the perf_counter() value *start*."""
+        tid = tid or self.pid
+        if tid not in self._tracks:
+            self._tracks[tid] = f"worker {tid}"
+        event = {
+            "name": name,
+            "cat": category,
+            "ph": "X",
+            "ts": (start - self._origin) * 1e6,
+            "dur": duration * 1e6,
+            "pid": self.pid,
+            "tid": tid,
+        }
+        if args:
+            event["args"] = args
+        self.events.append(event)
+
+    def add_timer(self, name, category, timer, args=None):
+        """Add the span measured by *timer*, possibly in a worker."""
+        if timer.start is not None:
+            self.add(name, category, timer.start, timer.wall, timer.pid, args)
+
+    def save(self, path):
+        """Write the trace to *path* as JSON."""
+        tracks = [
+            {
+                "name": "thread_name",
+                "ph": "M",
+                "pid": self.pid,
+                "tid": tid,
+                "args": {"name": name},
+            }
+            for tid, name in self._tracks.items()
+        ]
+        with open(path, "w", encoding="utf-8") as fhandle:
+            json.dump(
+                {"traceEvents": tracks + self.events, "displayTimeUnit": "ms"},
+                fhandle,
+            )
+        logger.info("Writing trace to %s", path)
+
+    def send(self, signal, sender=None, /, **kwargs):
+        """Replacement of Signal.send() recording a span for the signal and
+        for each of its receivers."""
+        with self.span(signal.name, "signal"):
+            if signal.is_muted or kwargs.get("_async_wrapper"):
+                return Signal.send(signal, sender, **kwargs)
+            results = []
+            for receiver in signal.receivers_for(sender):
+                name = getattr(receiver, "__qualname__", repr(receiver))
+                module = getattr(receiver, "__module__", None)
+                with self.span(
+                    name, "receiver", {"signal": signal.name, "module": module}
+                ):
+                    results.append((receiver, receiver(sender, **kwargs)))
+            return results
+
+
+def _get_signals():
+    return [value for value in vars(signals).values() if isinstance(value, Signal)]
+
+
+def _save(profile, path):
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    profile.save(path)
+
+
+def start(settings):
+    """Start profiling and tracing the build if the settings ask for it."""
+    global _profiler, _tracer  # noqa: PLW0603
+    _profiler = BuildProfiler() if settings.get("PROFILE_PATH") else None
+    _tracer = BuildTracer() if settings.get("TRACE_PATH") else None
+    for signal in _get_signals():
+        if _tracer is not None:
+            signal.send = partial(_tracer.send, signal)
+        else:
+            vars(signal).pop("send", None)
+
+
+def stop(settings, console):
+    """Stop profiling and tracing, print the profile and save it to
+    ``PROFILE_PATH``, and save the trace to ``TRACE_PATH``."""
+    global _profiler, _tracer  # noqa: PLW0603
+    profiler, tracer = _profiler, _tracer
+    _profiler = _tracer = None
+    for signal in _get_signals():
+        vars(signal).pop("send", None)
+
+    if profiler is not None:
+        for table in profiler.tables():
+            console.print(table)
+        _save(profiler, settings["PROFILE_PATH"])
+    if tracer is not None:
+        _save(tracer, settings["TRACE_PATH"])
+
+
+@contextmanager
+def phase(name, generator=None):
+    """Time a phase of the build, e.g. the generate_context() method of a
+    generator."""
+    if _profiler is None and _tracer is None:
+        yield
+        return
+    timer = _profiler.phase(name, generator) if _profiler else Timer()
+    with timer:
+        yield
+    if _tracer is not None:
+        if generator is not None and not isinstance(generator, type):
+            generator = type(generator)
+        label = f"{generator.__name__}.{name}" if generator else name
+        _tracer.add_timer(label, "phase", timer)
+
+
+@contextmanager
+def span(name, category, args=None):
+    """Record the ``with`` block in the trace of the build."""
+    if _tracer is None:
+        yield
+        return
+    with _tracer.span(name, category, args):
+        yield
+
+
+def traced(category, arg=None):
+    """Decorate a method to record its calls in the trace of the build.
+
+    :param category: the category of the spans.
+    :param arg: the name of an argument to add to the spans, e.g. the path of
+        the file being read.
+    """
+
+    def decorator(func):
+        name = func.__qualname__
+
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            if _tracer is None:
+                return func(*args, **kwargs)
+            span_args = {}
+            if arg is not None:
+                bound = signature(func).bind(*args, **kwargs)
+                span_args[arg] = str(bound.arguments.get(arg))
+            with _tracer.span(name, category, span_args):
+                return func(*args, **kwargs)
+
+        return wrapper
+
+    return decorator
+
+
+def record_read(path, reader, timer):
+    """Record the time *reader* took to read the source file *path*."""
+    name = type(reader).__name__
+    if _profiler is not None:
+        _profiler.record("read", path, name, timer)
+    if _tracer is not None:
+        _tracer.add_timer(f"{name}.read", "read", timer, {"path": path})
+
+
+def record_render(path, template, timer):
+    """Record the time *template* took to render the output file *path*."""
+    if _profiler is not None:
+        _profiler.record("render", path, template, timer)
+    if _tracer is not None:
+        _tracer.add_timer(template, "render", timer, {"path": path})
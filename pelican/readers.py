@@ -1,11 +1,15 @@
+import copy
 import datetime
 import logging
+import multiprocessing
 import os
 import re
 from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from contextlib import contextmanager
 from html import escape
 from html.parser import HTMLParser
-from io import StringIO
+from io import BytesIO, StringIO
 
 import docutils
 import docutils.core
@@ -13,16 +17,21 @@ import docutils.io
 from docutils.parsers.rst.languages import get_language as get_docutils_lang
 from docutils.writers.html4css1 import HTMLTranslator, Writer
 
-from pelican import rstdirectives  # NOQA
-from pelican.cache import FileStampDataCacher
-from pelican.contents import Author, Category, Page, SkipStub, Tag
+from pelican import (
+    profiling,
+    rstdirectives,
+)
+from pelican.cache import FileStampDataCacher, HighlightCache, _dump, _load
+from pelican.contents import Author, Category, Page, SkipStub, Tag, _empty_alt_re
 from pelican.plugins import signals
 from pelican.utils import file_suffix, get_date, pelican_open, posixize_path
 
 try:
     from markdown import Markdown
+    from markdown.extensions import codehilite
 except ImportError:
     Markdown = False
+    codehilite = None
 
 # Metadata processors have no way to discard an unwanted value, so we have
 # them return this value instead to signal that it should be discarded later.
@@ -30,6 +39,10 @@ except ImportError:
 # metadata dicts before use, to remove the items with the special value.
 _DISCARD = object()
 
+# The end of the Markdown metadata header, and of the head of HTML files
+_blank_line_re = re.compile(r"\n[ \t]*\n")
+_head_end_re = re.compile(r"</head\s*>", re.IGNORECASE)
+
 DUPLICATES_DEFINITIONS_ALLOWED = {
     "tags": False,
     "date": False,
@@ -93,6 +106,44 @@ def _filter_discardable_metadata(metadata):
     return {name: val for name, val in metadata.items() if val is not _DISCARD}
 
 
+# Readers used by the worker processes started by Readers.prefetch()
+_worker_readers = {}
+
+
+def _init_read_worker(readers):
+    _worker_readers.update(readers)
+
+
+@contextmanager
+def _highlighting(highlight_cache):
+    """Highlight the code blocks of the reStructuredText directives and of
+    the Markdown codehilite extension through *highlight_cache*."""
+    modules = [module for module in (rstdirectives, codehilite) if module]
+    highlights = [module.highlight for module in modules]
+    for module in modules:
+        module.highlight = highlight_cache.highlight
+    try:
+        yield
+    finally:
+        for module, highlight in zip(modules, highlights):
+            module.highlight = highlight
+
+
+def _read_in_worker(fmt, path):
+    reader = _worker_readers[fmt]
+    with profiling.Timer() as timer:
+        content, metadata = reader.read(path)
+    # the settings, which the URL wrappers of the metadata refer to, are
+    # pickled by reference and replaced with the ones of the build
+    buffer = BytesIO()
+    _dump(
+        (content, _filter_discardable_metadata(metadata), timer),
+        buffer,
+        {"settings": reader.settings},
+    )
+    return buffer.getvalue()
+
+
 class BaseReader:
     """Base class to read files.
 
@@ -125,6 +176,11 @@ class BaseReader:
         metadata = {}
         return content, metadata
 
+    def read_metadata(self, source_path):
+        """Return the metadata of a file, as returned by read(), converting
+        as little of its content as the format allows."""
+        return self.read(source_path)[1]
+
     def disabled_message(self) -> str:
         """Message about why this plugin was disabled."""
         return ""
@@ -187,6 +243,9 @@ class RstReader(BaseReader):
         field_body_translator_class     Used for translating metadata such
             as article summary
 
+    The docutils settings, parser and writer are prepared when the first
+    file is read and reused for the following files.
+
     """
 
     enabled = bool(docutils)
@@ -207,6 +266,7 @@ class RstReader(BaseReader):
                 lang_code,
             )
             self._language_code = "en"
+        self._components = None
 
     def _parse_metadata(self, document, source_path):
         """Return the dict containing document metadata"""
@@ -250,28 +310,58 @@ class RstReader(BaseReader):
                 output[name] = self.process_metadata(name, value)
         return output
 
-    def _get_publisher(self, source_path):
-        extra_params = {
-            "initial_header_level": "2",
-            "syntax_highlight": "short",
-            "input_encoding": "utf-8",
-            "language_code": self._language_code,
-            "halt_level": 2,
-            "traceback": True,
-            "warning_stream": StringIO(),
-            "embed_stylesheet": False,
-        }
-        user_params = self.settings.get("DOCUTILS_SETTINGS")
-        if user_params:
-            extra_params.update(user_params)
+    def __getstate__(self):
+        # the docutils components are prepared again by worker processes
+        state = self.__dict__.copy()
+        state["_components"] = None
+        return state
+
+    def _get_components(self):
+        """Return the docutils reader, parser, writer and frozen settings,
+        prepared once and shared by the documents read by this reader."""
+        if self._components is None:
+            extra_params = {
+                "initial_header_level": "2",
+                "syntax_highlight": "short",
+                "input_encoding": "utf-8",
+                "language_code": self._language_code,
+                "halt_level": 2,
+                "traceback": True,
+                "embed_stylesheet": False,
+            }
+            user_params = self.settings.get("DOCUTILS_SETTINGS")
+            if user_params:
+                extra_params.update(user_params)
+
+            pub = docutils.core.Publisher(writer=self.writer_class())
+            pub.set_components("standalone", "restructuredtext", "html")
+            pub.process_programmatic_settings(None, extra_params, None)
+            self._components = (pub.reader, pub.parser, pub.writer, pub.settings)
+        return self._components
+
+    def _get_publisher(self, source_path, write=True):
+        reader, parser, writer, settings = self._get_components()
+        # documents write to their own copy of the settings
+        settings = copy.copy(settings)
+        user_params = self.settings.get("DOCUTILS_SETTINGS") or {}
+        if "warning_stream" not in user_params:
+            settings.warning_stream = StringIO()
 
         pub = docutils.core.Publisher(
-            writer=self.writer_class(), destination_class=docutils.io.StringOutput
+            reader,
+            parser,
+            writer,
+            settings=settings,
+            destination_class=docutils.io.StringOutput,
         )
-        pub.set_components("standalone", "restructuredtext", "html")
-        pub.process_programmatic_settings(None, extra_params, None)
         pub.set_source(source_path=source_path)
-        pub.publish()
+        if write:
+            pub.publish()
+        else:
+            # parse and apply the transforms, e.g. the one building the
+            # docinfo, without translating the document
+            pub.document = reader.read(pub.source, parser, settings)
+            pub.apply_transforms()
         return pub
 
     def read(self, source_path):
@@ -285,9 +375,37 @@ class RstReader(BaseReader):
 
         return content, metadata
 
+    def read_metadata(self, source_path):
+        """Parse the metadata of restructured text, translating only the
+        formatted fields and the title"""
+        pub = self._get_publisher(source_path, write=False)
+        document = pub.document
+        visitor = self.field_body_translator_class(document)
+        # as the writer does, mark the first and last paragraphs of the
+        # fields, which the formatted fields are rendered with
+        for docinfo in document.children:
+            if isinstance(docinfo, docutils.nodes.docinfo):
+                for element in docinfo.children:
+                    if element.tagname == "field":
+                        visitor.set_first_last(element.children[1])
+        metadata = self._parse_metadata(document, source_path)
+        index = document.first_child_matching_class(docutils.nodes.title)
+        if index is not None and "title" not in metadata:
+            for child in document[index].children:
+                child.walkabout(visitor)
+            metadata["title"] = visitor.astext()
+        return metadata
+
 
 class MarkdownReader(BaseReader):
-    """Reader for Markdown files"""
+    """Reader for Markdown files
+
+    The Markdown converters are constructed when the first file is read,
+    then reset between files, rather than loading the extensions again for
+    each file. Formatted metadata fields are converted by a second converter
+    without the ``meta`` preprocessor, so that they are not parsed for
+    metadata.
+    """
 
     enabled = bool(Markdown)
     file_extensions = ["md", "markdown", "mkd", "mdown"]
@@ -303,14 +421,30 @@ class MarkdownReader(BaseReader):
         if "markdown.extensions.meta" not in settings["extensions"]:
             settings["extensions"].append("markdown.extensions.meta")
         self._source_path = None
+        self._md = None
+        self._fields_md = None
+
+    def __getstate__(self):
+        # the converters are constructed again by worker processes
+        state = self.__dict__.copy()
+        state["_md"] = state["_fields_md"] = None
+        return state
+
+    def _get_converters(self):
+        """Return the converters of the documents and of the formatted
+        metadata fields, reset."""
+        if self._md is None:
+            self._md = Markdown(**self.settings["MARKDOWN"])
+            self._fields_md = Markdown(**self.settings["MARKDOWN"])
+            # prevent metadata extraction in fields
+            self._fields_md.preprocessors.deregister("meta")
+        self._md.reset()
+        return self._md, self._fields_md
 
     def _parse_metadata(self, meta):
         """Return the dict containing document metadata"""
         formatted_fields = self.settings["FORMATTED_FIELDS"]
 
-        # prevent metadata extraction in fields
-        self._md.preprocessors.deregister("meta")
-
         output = {}
         for name, value in meta.items():
             name = name.lower()
@@ -318,8 +452,8 @@ class MarkdownReader(BaseReader):
                 # formatted metadata is special case and join all list values
                 formatted_values = "\n".join(value)
                 # reset the markdown instance to clear any state
-                self._md.reset()
-                formatted = self._md.convert(formatted_values)
+                self._fields_md.reset()
+                formatted = self._fields_md.convert(formatted_values)
                 output[name] = self.process_metadata(name, formatted)
             elif not DUPLICATES_DEFINITIONS_ALLOWED.get(name, True):
                 if len(value) > 1:
@@ -341,16 +475,28 @@ class MarkdownReader(BaseReader):
         """Parse content and metadata of markdown files"""
 
         self._source_path = source_path
-        self._md = Markdown(**self.settings["MARKDOWN"])
+        md, _ = self._get_converters()
         with pelican_open(source_path) as text:
-            content = self._md.convert(text)
+            content = md.convert(text)
 
-        if hasattr(self._md, "Meta"):
-            metadata = self._parse_metadata(self._md.Meta)
+        if hasattr(md, "Meta"):
+            metadata = self._parse_metadata(md.Meta)
         else:
             metadata = {}
         return content, metadata
 
+    def read_metadata(self, source_path):
+        """Parse the metadata of markdown files, converting only their
+        header, which ends at the first blank line"""
+        self._source_path = source_path
+        md, _ = self._get_converters()
+        with pelican_open(source_path) as text:
+            md.convert(_blank_line_re.split(text, maxsplit=1)[0])
+
+        if hasattr(md, "Meta"):
+            return self._parse_metadata(md.Meta)
+        return {}
+
     def disabled_message(self) -> str:
         return (
             "Could not import 'markdown.Markdown'. "
@@ -504,6 +650,16 @@ class HTMLReader(BaseReader):
             metadata[k] = self.process_metadata(k, parser.metadata[k])
         return parser.body, metadata
 
+    def read_metadata(self, filename):
+        """Parse the metadata of HTML files, from their head only"""
+        with pelican_open(filename) as content:
+            parser = self._HTMLParser(self.settings, filename)
+            end = _head_end_re.search(content)
+            parser.feed(content[: end.end()] if end else content)
+            parser.close()
+
+        return {k: self.process_metadata(k, v) for k, v in parser.metadata.items()}
+
 
 class Readers(FileStampDataCacher):
     """Interface for all readers.
@@ -515,8 +671,55 @@ class Readers(FileStampDataCacher):
 
     """
 
-    def __init__(self, settings=None, cache_name=""):
+    # The settings the output of the readers depends on: the cache of the
+    # readers is kept when other settings change
+    fingerprint_settings = (
+        "AUTHOR_REGEX_SUBSTITUTIONS",
+        "CATEGORY_REGEX_SUBSTITUTIONS",
+        "CHECK_MODIFIED_METHOD",
+        "DEFAULT_LANG",
+        "DOCUTILS_SETTINGS",
+        "FORMATTED_FIELDS",
+        "MARKDOWN",
+        "PYGMENTS_RST_OPTIONS",
+        "READERS",
+        "SLUGIFY_PRESERVE_CASE",
+        "SLUGIFY_USE_UNICODE",
+        "SLUG_REGEX_SUBSTITUTIONS",
+        "TAG_REGEX_SUBSTITUTIONS",
+    )
+
+    def __init__(self, settings=None, cache_name="", base=None):
+        """
+        :param settings: the settings of the build.
+        :param cache_name: the name of the reader-level cache, if any.
+        :param base: Readers whose reader objects are used, rather than
+            constructing them again (see partition()).
+        """
         self.settings = settings or {}
+        if base is not None:
+            self.reader_classes = base.reader_classes
+            self.readers = base.readers
+            self.disabled_readers = base.disabled_readers
+            self.highlight_cache = base.highlight_cache
+            self.path_metadata_matcher = base.path_metadata_matcher
+        else:
+            self._init_readers()
+            self.highlight_cache = HighlightCache(self.settings)
+            self.path_metadata_matcher = PathMetadataMatcher(self.settings)
+
+        # absolute path => (content, metadata, timer) parsed by prefetch()
+        self._prefetched = {}
+
+        # set up caching
+        cache_this_level = (
+            cache_name != "" and self.settings["CONTENT_CACHING_LAYER"] == "reader"
+        )
+        caching_policy = cache_this_level and self.settings["CACHE_CONTENT"]
+        load_policy = cache_this_level and self.settings["LOAD_CONTENT_CACHE"]
+        super().__init__(settings, cache_name, caching_policy, load_policy)
+
+    def _init_readers(self):
         self.readers = {}
         self.disabled_readers = {}
         # extension => reader for readers that are enabled
@@ -550,13 +753,80 @@ class Readers(FileStampDataCacher):
         for fmt, reader_class in disabled_reader_classes.items():
             self.disabled_readers[fmt] = reader_class(self.settings)
 
-        # set up caching
-        cache_this_level = (
-            cache_name != "" and self.settings["CONTENT_CACHING_LAYER"] == "reader"
-        )
-        caching_policy = cache_this_level and self.settings["CACHE_CONTENT"]
-        load_policy = cache_this_level and self.settings["LOAD_CONTENT_CACHE"]
-        super().__init__(settings, cache_name, caching_policy, load_policy)
+    def partition(self, cache_name):
+        """Return Readers using the same reader objects as these ones, with
+        their own cache named *cache_name*."""
+        return type(self)(self.settings, cache_name, base=self)
+
+    def _get_cache_key(self, path):
+        """Return the cache key of a source file: its path relative to PATH,
+        so that the cache can be used by builds in other directories."""
+        return posixize_path(os.path.relpath(path, self.settings["PATH"]))
+
+    def _get_file_stamp(self, filename, previous=None):
+        """Get filestamp for path relative to PATH"""
+        filename = os.path.join(self.settings["PATH"], filename)
+        return super()._get_file_stamp(filename, previous)
+
+    def _read(self, reader, path):
+        if not self.highlight_cache.is_enabled():
+            return reader.read(path)
+        with _highlighting(self.highlight_cache):
+            return reader.read(path)
+
+    def _read_uncached(self, reader, path, source_path, cache_key):
+        """Return the content and metadata of a file missing from the cache,
+        and cache them."""
+        if path in self._prefetched:
+            content, reader_metadata, timer = self._prefetched.pop(path)
+        else:
+            with profiling.Timer() as timer:
+                content, reader_metadata = self._read(reader, path)
+            reader_metadata = _filter_discardable_metadata(reader_metadata)
+        profiling.record_read(source_path, reader, timer)
+        self.cache_data(cache_key, (content, reader_metadata))
+        return content, reader_metadata
+
+    def _process_content(self, content):
+        # eventually filter the content with typogrify if asked so
+        if content and self.settings["TYPOGRIFY"]:
+            content = self._typogrify(content)
+        return content
+
+    def _typogrify(self, text):
+        # typogrify is an optional feature, user may not have it installed
+        import smartypants  # noqa: PLC0415
+        from typogrify.filters import typogrify  # noqa: PLC0415
+
+        typogrify_dashes = self.settings["TYPOGRIFY_DASHES"]
+        if typogrify_dashes == "oldschool":
+            smartypants.Attr.default = smartypants.Attr.set2
+        elif typogrify_dashes == "oldschool_inverted":
+            smartypants.Attr.default = smartypants.Attr.set3
+        else:
+            smartypants.Attr.default = smartypants.Attr.set1
+
+        # Tell `smartypants` to also replace &quot; HTML entities with
+        # smart quotes. This is necessary because Docutils has already
+        # replaced double quotes with said entities by the time we run
+        # this filter.
+        smartypants.Attr.default |= smartypants.Attr.w
+
+        # Ensure compatibility with older versions of Typogrify: the
+        # 'TYPOGRIFY_IGNORE_TAGS' and/or 'TYPOGRIFY_OMIT_FILTERS' settings
+        # will be ignored if the installed version of Typogrify doesn't have
+        # the corresponding features.
+        try:
+            return typogrify(
+                text,
+                self.settings["TYPOGRIFY_IGNORE_TAGS"],
+                **dict.fromkeys(self.settings["TYPOGRIFY_OMIT_FILTERS"], False),
+            )
+        except TypeError:
+            try:
+                typogrify(text, self.settings["TYPOGRIFY_IGNORE_TAGS"])
+            except TypeError:
+                return typogrify(text)
 
     @property
     def extensions(self):
@@ -567,6 +837,69 @@ class Readers(FileStampDataCacher):
     def disabled_extensions(self):
         return self.disabled_readers.keys()
 
+    def prefetch(self, base_path, paths, workers, fmt=None):
+        """Parse the given files in a pool of worker processes.
+
+        Only the reader output (content and metadata) is computed in the
+        workers. read_file() still sends the preread and context signals,
+        merges the path metadata and builds the content object in this
+        process, in the order in which it is called. Files that cannot be
+        parsed in a worker are left to read_file(), so that errors are
+        reported as usual.
+
+        :param base_path: the path the given paths are relative to.
+        :param paths: the files to parse.
+        :param workers: the number of worker processes, 0 meaning one per CPU.
+        :param fmt: the format to use instead of the file extension.
+        """
+        workers = workers or os.cpu_count() or 1
+        jobs = {}
+        for path in paths:
+            path = os.path.abspath(os.path.join(base_path, path))
+            path_fmt = fmt or file_suffix(path)
+            if path_fmt not in self.readers or path in self._prefetched:
+                continue
+            if self.get_cached_data(self._get_cache_key(path), None) is not None:
+                continue
+            jobs[path] = path_fmt
+
+        if workers < 2 or len(jobs) < 2:  # noqa: PLR2004
+            return
+
+        # Forked workers inherit the readers registered by plugins
+        if "fork" in multiprocessing.get_all_start_methods():
+            mp_context = multiprocessing.get_context("fork")
+        else:
+            mp_context = None
+
+        logger.debug("Reading %s files with %s workers", len(jobs), workers)
+        try:
+            with ProcessPoolExecutor(
+                max_workers=min(workers, len(jobs)),
+                mp_context=mp_context,
+                initializer=_init_read_worker,
+                initargs=(self.readers,),
+            ) as executor:
+                futures = {
+                    executor.submit(_read_in_worker, path_fmt, path): path
+                    for path, path_fmt in jobs.items()
+                }
+                for future in as_completed(futures):
+                    path = futures[future]
+                    try:
+                        self._prefetched[path] = _load(
+                            BytesIO(future.result()), {"settings": self.settings}
+                        )
+                    except Exception as err:
+                        logger.debug(
+                            "Could not read %s in a worker process\n%s", path, err
+                        )
+        except Exception as err:
+            logger.warning(
+                "Could not read files in parallel, reading them serially\n%s", err
+            )
+
+    @profiling.traced("reader", arg="path")
     def read_file(
         self,
         base_path,
@@ -578,8 +911,14 @@ class Readers(FileStampDataCacher):
         preread_sender=None,
         context_signal=None,
         context_sender=None,
+        metadata_only=False,
     ):
-        """Return a content object parsed with the given format."""
+        """Return a content object parsed with the given format.
+
+        With *metadata_only*, a file which is not cached is only parsed for
+        its metadata, and its content is converted when the content object
+        first needs it, e.g. to render it or its summary.
+        """
 
         path = os.path.abspath(os.path.join(base_path, path))
         source_path = posixize_path(os.path.relpath(path, base_path))
@@ -602,7 +941,10 @@ class Readers(FileStampDataCacher):
         )
         metadata.update(
             path_metadata(
-                full_path=path, source_path=source_path, settings=self.settings
+                full_path=path,
+                source_path=source_path,
+                settings=self.settings,
+                matcher=self.path_metadata_matcher,
             )
         )
         metadata.update(
@@ -611,69 +953,39 @@ class Readers(FileStampDataCacher):
                     source_path=source_path,
                     settings=self.settings,
                     process=reader.process_metadata,
+                    matcher=self.path_metadata_matcher,
                 )
             )
         )
         reader_name = reader.__class__.__name__
         metadata["reader"] = reader_name.replace("Reader", "").lower()
 
-        content, reader_metadata = self.get_cached_data(path, (None, None))
-        if content is None:
-            content, reader_metadata = reader.read(path)
-            reader_metadata = _filter_discardable_metadata(reader_metadata)
-            self.cache_data(path, (content, reader_metadata))
-        metadata.update(reader_metadata)
+        cache_key = self._get_cache_key(path)
+        content, reader_metadata = self.get_cached_data(cache_key, (None, None))
+        if content is None and metadata_only and path not in self._prefetched:
+            reader_metadata = _filter_discardable_metadata(reader.read_metadata(path))
 
-        if content:
-            # find images with empty alt
-            find_empty_alt(content, path)
+            def content():
+                body, _ = self._read_uncached(reader, path, source_path, cache_key)
+                body = self._process_content(body)
+                if body:
+                    find_empty_alt(body, path)
+                return body
 
-        # eventually filter the content with typogrify if asked so
-        if self.settings["TYPOGRIFY"]:
-            # typogrify is an optional feature, user may not have it installed
-            import smartypants  # noqa: PLC0415
-            from typogrify.filters import typogrify  # noqa: PLC0415
-
-            typogrify_dashes = self.settings["TYPOGRIFY_DASHES"]
-            if typogrify_dashes == "oldschool":
-                smartypants.Attr.default = smartypants.Attr.set2
-            elif typogrify_dashes == "oldschool_inverted":
-                smartypants.Attr.default = smartypants.Attr.set3
-            else:
-                smartypants.Attr.default = smartypants.Attr.set1
-
-            # Tell `smartypants` to also replace &quot; HTML entities with
-            # smart quotes. This is necessary because Docutils has already
-            # replaced double quotes with said entities by the time we run
-            # this filter.
-            smartypants.Attr.default |= smartypants.Attr.w
-
-            def typogrify_wrapper(text):
-                """Ensure compatibility with older versions of Typogrify.
-
-                The 'TYPOGRIFY_IGNORE_TAGS' and/or 'TYPOGRIFY_OMIT_FILTERS'
-                settings will be ignored if the installed version of Typogrify
-                doesn't have the corresponding features."""
-                try:
-                    return typogrify(
-                        text,
-                        self.settings["TYPOGRIFY_IGNORE_TAGS"],
-                        **dict.fromkeys(self.settings["TYPOGRIFY_OMIT_FILTERS"], False),
-                    )
-                except TypeError:
-                    try:
-                        typogrify(text, self.settings["TYPOGRIFY_IGNORE_TAGS"])
-                    except TypeError:
-                        return typogrify(text)
-
-            if content:
-                content = typogrify_wrapper(content)
+        else:
+            if content is None:
+                content, reader_metadata = self._read_uncached(
+                    reader, path, source_path, cache_key
+                )
+            content = self._process_content(content)
+        metadata.update(reader_metadata)
 
+        if self.settings["TYPOGRIFY"]:
             if "title" in metadata:
-                metadata["title"] = typogrify_wrapper(metadata["title"])
+                metadata["title"] = self._typogrify(metadata["title"])
 
             if "summary" in metadata:
-                metadata["summary"] = typogrify_wrapper(metadata["summary"])
+                metadata["summary"] = self._typogrify(metadata["summary"])
 
         if context_signal:
             logger.debug(
@@ -684,13 +996,18 @@ class Readers(FileStampDataCacher):
         if metadata.get("status") == "skip":
             content_class = SkipStub
 
-        return content_class(
+        content_object = content_class(
             content=content,
             metadata=metadata,
             settings=self.settings,
             source_path=path,
             context=context,
         )
+        if isinstance(content, str) and not isinstance(content_object, SkipStub):
+            # found by the scan of the HTML done once for the content object
+            for src in content_object.get_empty_alt_images():
+                _warn_empty_alt(src, path)
+        return content_object
 
     def check_file(self, source_path: str) -> None:
         """Log a warning if a file is processed by a disabled reader."""
@@ -706,33 +1023,17 @@ def find_empty_alt(content, path):
     as they are really likely to be accessibility flaws.
 
     """
-    imgs = re.compile(
-        r"""
-        (?:
-            # src before alt
-            <img
-            [^\>]*
-            src=(['"])(.*?)\1
-            [^\>]*
-            alt=(['"])\3
-        )|(?:
-            # alt before src
-            <img
-            [^\>]*
-            alt=(['"])\4
-            [^\>]*
-            src=(['"])(.*?)\5
-        )
-        """,
-        re.X,
+    for match in _empty_alt_re.findall(content):
+        _warn_empty_alt(match[1] + match[5], path)
+
+
+def _warn_empty_alt(src, path):
+    logger.warning(
+        "Empty alt attribute for image %s in %s",
+        os.path.basename(src),
+        path,
+        extra={"limit_msg": "Other images have empty alt attributes"},
     )
-    for match in re.findall(imgs, content):
-        logger.warning(
-            "Empty alt attribute for image %s in %s",
-            os.path.basename(match[1] + match[5]),
-            path,
-            extra={"limit_msg": "Other images have empty alt attributes"},
-        )
 
 
 def default_metadata(settings=None, process=None):
@@ -755,7 +1056,92 @@ def default_metadata(settings=None, process=None):
     return metadata
 
 
-def path_metadata(full_path, source_path, settings=None):
+class PathMetadataMatcher:
+    """The FILENAME_METADATA, PATH_METADATA, USE_FOLDER_AS_CATEGORY and
+    EXTRA_PATH_METADATA settings, compiled once for the files of a build.
+
+    The EXTRA_PATH_METADATA entries are stored in a trie of path components,
+    so that the entries applying to a file are found in as many steps as the
+    file has parent directories, rather than by checking every entry.
+    """
+
+    class _Node:
+        __slots__ = ("children", "entries")
+
+        def __init__(self):
+            self.children = {}
+            # (metadata, whether it only applies to the files below the node)
+            self.entries = []
+
+    def __init__(self, settings):
+        self.checks = []
+        for key in ("FILENAME_METADATA", "PATH_METADATA"):
+            regexp = settings.get(key, None)
+            self.checks.append((key, re.compile(regexp) if regexp else None))
+        if settings.get("USE_FOLDER_AS_CATEGORY", None):
+            self.checks.append(
+                ("USE_FOLDER_AS_CATEGORY", re.compile("(?P<category>.*)"))
+            )
+
+        self._root = self._Node()
+        # Sorting EPM first ensures that the most specific path wins conflicts
+        for path, meta in sorted(settings.get("EXTRA_PATH_METADATA", {}).items()):
+            components = posixize_path(path).split("/")
+            # A trailing slash only matches the files in the directory
+            below_only = components[-1] == ""
+            if below_only:
+                components.pop()
+            node = self._root
+            for component in components:
+                node = node.children.setdefault(component, self._Node())
+            node.entries.append((meta, below_only))
+
+    def extra_path_metadata(self, source_path):
+        """Return the EXTRA_PATH_METADATA of the source path and of its parent
+        directories, merged."""
+        metadata = {}
+        node = self._root
+        for component in source_path.split("/"):
+            for meta, _ in node.entries:
+                metadata.update(meta)
+            node = node.children.get(component)
+            if node is None:
+                return metadata
+        for meta, below_only in node.entries:
+            if not below_only:
+                metadata.update(meta)
+        return metadata
+
+    def parse(self, source_path, process=None):
+        """Return the metadata matched by the regular expressions"""
+        metadata = {}
+        dirname, basename = os.path.split(source_path)
+        data = {
+            "FILENAME_METADATA": os.path.splitext(basename)[0],
+            "PATH_METADATA": source_path,
+            "USE_FOLDER_AS_CATEGORY": os.path.basename(dirname),
+        }
+        for key, regexp in self.checks:
+            if regexp and data[key]:
+                match = regexp.match(data[key])
+                if match:
+                    # .items() for py3k compat.
+                    for k, v in match.groupdict().items():
+                        k = k.lower()  # metadata must be lowercase
+                        if v is not None and k not in metadata:
+                            if process:
+                                v = process(k, v)
+                            metadata[k] = v
+        return metadata
+
+
+def path_metadata(full_path, source_path, settings=None, matcher=None):
+    """Return the metadata of a file set by the DEFAULT_DATE and
+    EXTRA_PATH_METADATA settings.
+
+    :param matcher: the PathMetadataMatcher of the settings, if already
+        constructed.
+    """
     metadata = {}
     if settings:
         if settings.get("DEFAULT_DATE", None) == "fs":
@@ -765,22 +1151,15 @@ def path_metadata(full_path, source_path, settings=None):
             metadata["modified"] = metadata["date"]
 
         # Apply EXTRA_PATH_METADATA for the source path and the paths of any
-        # parent directories. Sorting EPM first ensures that the most specific
-        # path wins conflicts.
-
-        epm = settings.get("EXTRA_PATH_METADATA", {})
-        for path, meta in sorted(epm.items()):
-            # Enforce a trailing slash when checking for parent directories.
-            # This prevents false positives when one file or directory's name
-            # is a prefix of another's.
-            dirpath = posixize_path(os.path.join(path, ""))
-            if source_path == path or source_path.startswith(dirpath):
-                metadata.update(meta)
+        # parent directories.
+        if matcher is None:
+            matcher = PathMetadataMatcher(settings)
+        metadata.update(matcher.extra_path_metadata(source_path))
 
     return metadata
 
 
-def parse_path_metadata(source_path, settings=None, process=None):
+def parse_path_metadata(source_path, settings=None, process=None, matcher=None):
     r"""Extract a metadata dictionary from a file's path
 
     >>> import pprint
@@ -798,26 +1177,12 @@ def parse_path_metadata(source_path, settings=None, process=None):
     {'category': <pelican.urlwrappers.Category object at ...>,
      'date': datetime.datetime(2013, 1, 1, 0, 0),
      'slug': 'my-slug'}
+
+    *matcher* is the PathMetadataMatcher of the settings, if already
+    constructed.
     """
-    metadata = {}
-    dirname, basename = os.path.split(source_path)
-    base, ext = os.path.splitext(basename)
-    subdir = os.path.basename(dirname)
-    if settings:
-        checks = []
-        for key, data in [("FILENAME_METADATA", base), ("PATH_METADATA", source_path)]:
-            checks.append((settings.get(key, None), data))
-        if settings.get("USE_FOLDER_AS_CATEGORY", None):
-            checks.append(("(?P<category>.*)", subdir))
-        for regexp, data in checks:
-            if regexp and data:
-                match = re.match(regexp, data)
-                if match:
-                    # .items() for py3k compat.
-                    for k, v in match.groupdict().items():
-                        k = k.lower()  # metadata must be lowercase
-                        if v is not None and k not in metadata:
-                            if process:
-                                v = process(k, v)
-                            metadata[k] = v
-    return metadata
+    if not settings:
+        return {}
+    if matcher is None:
+        matcher = PathMetadataMatcher(settings)
+    return matcher.parse(source_path, process)
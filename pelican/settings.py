@@ -134,6 +134,7 @@ DEFAULT_CONFIG = {
     "JINJA_FILTERS": {},
     "JINJA_GLOBALS": {},
     "JINJA_TESTS": {},
+    "JINJA_BYTECODE_CACHE": None,
     "JINJA_ENVIRONMENT": {
         "trim_blocks": True,
         "lstrip_blocks": True,
@@ -174,8 +175,15 @@ DEFAULT_CONFIG = {
     "CONTENT_CACHING_LAYER": "reader",
     "CACHE_PATH": "cache",
     "GZIP_CACHE": True,
+    "CACHE_BACKEND": "pickle",
     "CHECK_MODIFIED_METHOD": "mtime",
     "LOAD_CONTENT_CACHE": False,
+    "INCREMENTAL_BUILD": False,
+    "READER_WORKERS": 1,
+    "WRITER_WORKERS": 1,
+    "PROFILE_PATH": None,
+    "TRACE_PATH": None,
+    "CACHE_STATS_PATH": None,
     "FORMATTED_FIELDS": ["summary"],
     "PORT": 8000,
     "BIND": "127.0.0.1",
@@ -218,6 +226,11 @@ def read_settings(
                 getabs(pluginpath) for pluginpath in settings["PLUGIN_PATHS"]
             ]
 
+    # incremental builds use the record of the previous build, unless the
+    # caches are explicitly ignored, e.g. with --ignore-cache
+    if settings.get("INCREMENTAL_BUILD"):
+        settings.setdefault("LOAD_CONTENT_CACHE", True)
+
     settings = dict(copy.deepcopy(DEFAULT_CONFIG), **settings)
     settings = configure_settings(settings)
 
@@ -609,6 +622,8 @@ def configure_settings(settings: Settings) -> Settings:
     for key, types in [
         ("OUTPUT_SOURCES_EXTENSION", str),
         ("FILENAME_METADATA", str),
+        ("READER_WORKERS", int),
+        ("WRITER_WORKERS", int),
     ]:
         if key in settings and not isinstance(settings[key], types):
             value = settings.pop(key)
@@ -619,6 +634,18 @@ def configure_settings(settings: Settings) -> Settings:
                 DEFAULT_CONFIG[key],
             )
 
+    # check settings that must be one of a few values
+    for key, values in [("CACHE_BACKEND", ("pickle", "sqlite"))]:
+        if key in settings and settings[key] not in values:
+            value = settings[key]
+            settings[key] = DEFAULT_CONFIG[key]
+            logger.warning(
+                "Detected misconfigured %s (%s), falling back to the default (%s)",
+                key,
+                value,
+                DEFAULT_CONFIG[key],
+            )
+
     # try to set the different locales, fallback on the default.
     locales = settings.get("LOCALE", DEFAULT_CONFIG["LOCALE"])
 
@@ -1,9 +1,24 @@
+import json
 import os
-from shutil import rmtree
+from shutil import copytree, rmtree
 from tempfile import mkdtemp
-from unittest.mock import MagicMock
-
+from unittest.mock import MagicMock, patch
+
+import pygments
+from pygments.formatters import HtmlFormatter
+from pygments.lexers import PythonLexer
+
+from pelican import readers as pelican_readers
+from pelican.cache import (
+    FileDataCacher,
+    FileStampDataCacher,
+    HighlightCache,
+    SQLiteCache,
+    _hash_file,
+    report,
+)
 from pelican.generators import ArticlesGenerator, PagesGenerator
+from pelican.readers import Readers
 from pelican.tests.support import get_context, get_settings, unittest
 
 CUR_DIR = os.path.dirname(__file__)
@@ -224,6 +239,83 @@ class TestCache(unittest.TestCase):
         for reader in readers.values():
             self.assertEqual(reader.read.call_count, 0)
 
+    def test_reader_workers_caching(self):
+        """Test that the contents read by worker processes refer to the
+        settings of the build, which are not cached along with them"""
+        settings = self._get_cache_enabled_settings()
+        settings["READERS"] = {"asc": None}
+        settings["READER_WORKERS"] = 2
+
+        def generate(settings):
+            generator = ArticlesGenerator(
+                context=get_context(settings),
+                settings=settings,
+                path=CONTENT_DIR,
+                theme=settings["THEME"],
+                output_path=None,
+            )
+            generator.generate_context()
+            return generator
+
+        generator = generate(settings)
+        for tag in generator.tags:
+            self.assertIs(tag.settings, settings)
+
+        settings = dict(settings, TAG_URL="tags/{slug}/")
+        generator = generate(settings)
+        self.assertTrue(generator.tags)
+        for tag in generator.tags:
+            self.assertEqual(tag.url, f"tags/{tag.slug}/")
+
+    def test_cache_relocatable(self):
+        """Test that a cache can be used by a build of a copy of the site in
+        another directory"""
+        # the files which are not valid articles are not cached by the
+        # generator (see test_article_object_caching)
+        not_cached = {
+            "reader": set(),
+            "generator": {
+                "2012-11-30_md_w_filename_meta#foo-bar.md",
+                "article_skip.md",
+                "article_with_attributes_containing_double_quotes.html",
+                "article_with_comments.html",
+                "article_with_null_attributes.html",
+                "empty.md",
+                "empty_with_bom.md",
+            },
+        }
+        for layer in ("reader", "generator"):
+            settings = self._get_cache_enabled_settings()
+            settings["CONTENT_CACHING_LAYER"] = layer
+            settings["CHECK_MODIFIED_METHOD"] = "mtime+sha1"
+            settings["DEFAULT_DATE"] = (1970, 1, 1)
+            settings["READERS"] = {"asc": None}
+            for checkout in ("first", "second"):
+                path = os.path.join(self.temp_cache, layer, checkout, "content")
+                copytree(CONTENT_DIR, path)
+                settings["PATH"] = path
+                generator = ArticlesGenerator(
+                    context=get_context(settings),
+                    settings=settings,
+                    path=path,
+                    theme=settings["THEME"],
+                    output_path=None,
+                )
+                readers = generator.readers.readers
+                for reader in readers.values():
+                    reader.read = MagicMock(wraps=reader.read)
+                generator.generate_context()
+
+            # only the files which could not be cached are read again
+            read = {
+                os.path.basename(call.args[0])
+                for reader in readers.values()
+                for call in reader.read.call_args_list
+            }
+            self.assertEqual(read, not_cached[layer])
+            for article in generator.articles:
+                self.assertTrue(article.source_path.startswith(path + os.sep))
+
     def test_article_ignore_cache(self):
         """Test that all the articles are read again when not loading cache
 
@@ -352,3 +444,286 @@ class TestCache(unittest.TestCase):
         generator.readers.read_file = MagicMock()
         generator.generate_context()
         self.assertEqual(generator.readers.read_file.call_count, orig_call_count)
+
+    def test_unused_entries_evicted(self):
+        """Test that entries not used by a build are dropped from the cache"""
+        settings = self._get_cache_enabled_settings()
+        cacher = FileDataCacher(settings, "Test", True, True)
+        cacher.cache_data("kept.rst", "kept")
+        cacher.cache_data("deleted.rst", "deleted")
+        cacher.save_cache()
+
+        cacher = FileDataCacher(settings, "Test", True, True)
+        self.assertEqual(cacher.get_cached_data("kept.rst"), "kept")
+        with self.assertLogs("pelican.cache", "INFO") as logs:
+            cacher.save_cache()
+        self.assertIn("1 entry, 1 evicted", logs.output[0])
+
+        cacher = FileDataCacher(settings, "Test", True, True)
+        self.assertEqual(cacher.get_cached_data("kept.rst"), "kept")
+        self.assertIsNone(cacher.get_cached_data("deleted.rst"))
+
+    def test_cache_discarded_on_fingerprint_change(self):
+        """Test that a cache saved with other settings, plugins or Pelican
+        version is not used"""
+
+        class ReaderLikeCacher(FileDataCacher):
+            fingerprint_settings = ("MARKDOWN",)
+
+        def cached(cacher_class, settings):
+            cacher = cacher_class(settings, cacher_class.__name__, True, True)
+            value = cacher.get_cached_data("a.rst")
+            cacher.cache_data("a.rst", settings)
+            cacher.save_cache()
+            return value
+
+        settings = self._get_cache_enabled_settings()
+        for cacher_class in (FileDataCacher, ReaderLikeCacher):
+            self.assertIsNone(cached(cacher_class, settings))
+            # the settings are replaced by the current ones when loading
+            self.assertIs(cached(cacher_class, settings), settings)
+
+        # settings not affecting the cached data are ignored
+        settings["WRITER_WORKERS"] = 4
+        self.assertIsNotNone(cached(FileDataCacher, settings))
+
+        settings["ARTICLE_URL"] = "posts/{slug}/"
+        self.assertIsNone(cached(FileDataCacher, settings))
+        self.assertIsNotNone(cached(ReaderLikeCacher, settings))
+
+        settings["PLUGINS"] = ["pelican.tests.dummy_plugins.normal_plugin"]
+        self.assertIsNone(cached(FileDataCacher, settings))
+        self.assertIsNone(cached(ReaderLikeCacher, settings))
+
+        with patch("pelican.__version__", "0.0"):
+            self.assertIsNone(cached(FileDataCacher, settings))
+            self.assertIsNone(cached(ReaderLikeCacher, settings))
+
+    def test_reader_cache_discarded_on_settings_change(self):
+        """Test that files are read again when a setting used by the readers,
+        like the default options of the code-block directive, changes"""
+        settings = self._get_cache_enabled_settings()
+        path = "article_with_code_block.rst"
+
+        def read(settings):
+            readers = Readers(settings, "Readers")
+            reader = readers.readers["rst"]
+            options = settings["PYGMENTS_RST_OPTIONS"]
+            with patch("pelican.settings.PYGMENTS_RST_OPTIONS", options):
+                with patch.object(reader, "read", wraps=reader.read) as read:
+                    content = readers.read_file(CONTENT_DIR, path).content
+            readers.save_cache()
+            return content, read.call_count
+
+        content, calls = read(settings)
+        self.assertEqual(calls, 1)
+        self.assertEqual(read(settings), (content, 0))
+
+        settings["PYGMENTS_RST_OPTIONS"] = {"linenos": "table"}
+        content, calls = read(settings)
+        self.assertEqual(calls, 1)
+        self.assertIn("linenos", content)
+        self.assertEqual(read(settings), (content, 0))
+
+    def test_hybrid_check_modified_method(self):
+        """Test that files are only hashed when their size or modification
+        time changed"""
+        settings = self._get_cache_enabled_settings()
+        settings["CHECK_MODIFIED_METHOD"] = "mtime+sha256"
+        path = os.path.join(self.temp_cache, "article.rst")
+        with open(path, "w") as fhandle:
+            fhandle.write("Title\n#####\n")
+
+        def cached(data):
+            cacher = FileStampDataCacher(settings, "Test", True, True)
+            with patch("pelican.cache._hash_file", wraps=_hash_file) as hash_file:
+                value = cacher.get_cached_data(path)
+                if value is None:
+                    cacher.cache_data(path, data)
+                cacher.save_cache()
+            return value, hash_file.call_count
+
+        self.assertEqual(cached("a"), (None, 1))
+        self.assertEqual(cached("b"), ("a", 0))
+
+        # same contents with another modification time, e.g. after a checkout
+        mtime_ns = os.stat(path).st_mtime_ns
+        os.utime(path, ns=(mtime_ns + 10**9, mtime_ns + 10**9))
+        self.assertEqual(cached("b"), ("a", 1))
+        self.assertEqual(cached("b"), ("a", 0))
+
+        with open(path, "a") as fhandle:
+            fhandle.write("\nModified.\n")
+        self.assertEqual(cached("c"), (None, 1))
+        self.assertEqual(cached("d"), ("c", 0))
+
+    def test_cache_stats(self):
+        """Test that hits, misses and stale entries are counted once per
+        file"""
+        settings = self._get_cache_enabled_settings()
+        paths = {}
+        for name in ("unchanged", "modified"):
+            paths[name] = os.path.join(self.temp_cache, name + ".rst")
+            with open(paths[name], "w") as fhandle:
+                fhandle.write(name)
+
+        cacher = FileStampDataCacher(settings, "Test", True, True)
+        for path in paths.values():
+            self.assertIsNone(cacher.get_cached_data(path))
+            cacher.cache_data(path, "data")
+        cacher.save_cache()
+        stats = cacher.get_stats()
+        self.assertEqual((stats.hits, stats.misses, stats.stale), (0, 2, 0))
+        self.assertGreater(stats.size, 0)
+
+        mtime = os.path.getmtime(paths["modified"]) + 10
+        os.utime(paths["modified"], (mtime, mtime))
+        cacher = FileStampDataCacher(settings, "Test", True, True)
+        for _ in range(2):
+            for path in [*paths.values(), "missing.rst"]:
+                cacher.get_cached_data(path)
+        stats = cacher.get_stats()
+        self.assertEqual((stats.hits, stats.misses, stats.stale), (1, 1, 1))
+
+        stats_path = os.path.join(self.temp_cache, "stats", "caches.json")
+        settings["CACHE_STATS_PATH"] = stats_path
+        with self.assertLogs("pelican.cache", "INFO"):
+            report([cacher], settings, MagicMock())
+        with open(stats_path) as fhandle:
+            self.assertEqual(json.load(fhandle)[0]["stale"], 1)
+
+    def test_highlight_cache(self):
+        """Test that code blocks are highlighted once, even by the builds
+        which do not read their file"""
+        settings = self._get_cache_enabled_settings()
+        path = "article_with_code_block.rst"
+
+        def read(settings):
+            readers = Readers(settings)
+            with patch(
+                "pelican.cache.pygments.highlight", wraps=pygments.highlight
+            ) as highlight:
+                content = readers.read_file(CONTENT_DIR, path).content
+            readers.highlight_cache.save_cache()
+            return content, highlight.call_count
+
+        content, calls = read(settings)
+        self.assertIn('<div class="highlight">', content)
+        self.assertGreater(calls, 0)
+        self.assertEqual(read(settings), (content, 0))
+
+        # entries are kept by the builds which do not use them, for a while
+        for max_idle_builds, expected_calls in ((1, 0), (0, calls)):
+            with patch.object(HighlightCache, "max_idle_builds", max_idle_builds):
+                Readers(settings).highlight_cache.save_cache()
+                self.assertEqual(read(settings), (content, expected_calls))
+
+        settings["LOAD_CONTENT_CACHE"] = False
+        self.assertEqual(read(settings), (content, calls))
+
+    def test_highlighting_restored(self):
+        """Test that the highlight functions of the code-block directive and of
+        the codehilite extension are restored after reading, even on error"""
+        readers = Readers(self._get_cache_enabled_settings())
+        modules = [
+            module
+            for module in (pelican_readers.rstdirectives, pelican_readers.codehilite)
+            if module
+        ]
+        patched = []
+
+        def read(path):
+            patched.extend(module.highlight for module in modules)
+            raise RuntimeError
+
+        with patch.object(readers.readers["rst"], "read", side_effect=read):
+            with self.assertRaises(RuntimeError):
+                readers.read_file(CONTENT_DIR, "article_with_code_block.rst")
+        self.assertEqual(patched, [readers.highlight_cache.highlight] * len(modules))
+        for module in modules:
+            self.assertIs(module.highlight, pygments.highlight)
+
+        readers.read_file(CONTENT_DIR, "article_with_code_block.rst")
+        for module in modules:
+            self.assertIs(module.highlight, pygments.highlight)
+
+
+class TestSQLiteCache(TestCache):
+    """Run the cache tests again with the SQLite cache backend"""
+
+    def _get_cache_enabled_settings(self):
+        settings = super()._get_cache_enabled_settings()
+        settings["CACHE_BACKEND"] = "sqlite"
+        return settings
+
+    def test_entries_loaded_and_saved_individually(self):
+        path = os.path.join(self.temp_cache, "Test.sqlite")
+        settings = {"SITENAME": "A site"}
+        cache = SQLiteCache(path, compress=True, shared={"settings": settings})
+        cache["a"] = ("a", settings)
+        cache["b"] = "b"
+        cache.save()
+
+        cache = SQLiteCache(path, compress=True, shared={"settings": settings})
+        self.assertEqual(set(cache), {"a", "b"})
+        with patch.object(cache, "_loads", wraps=cache._loads) as loads:
+            value = cache["a"]
+            self.assertEqual(cache.get("c"), None)
+        self.assertEqual(loads.call_count, 1)
+        # shared objects are pickled by reference
+        self.assertIs(value[1], settings)
+
+        cache["c"] = "c"
+        del cache["b"]
+        with patch.object(cache, "_dumps", wraps=cache._dumps) as dumps:
+            cache.save()
+        self.assertEqual(dumps.call_count, 1)
+
+        cache = SQLiteCache(path, compress=True)
+        self.assertEqual(set(cache), {"a", "c"})
+        self.assertEqual(cache["c"], "c")
+
+        # entries of previous builds are dropped when they are not loaded
+        cache = SQLiteCache(path, compress=True, load=False)
+        self.assertEqual(set(cache), set())
+        cache["d"] = "d"
+        cache.save()
+        self.assertEqual(set(SQLiteCache(path, compress=True)), {"d"})
+
+    def test_connection_closed(self):
+        """Test that the database is closed once the cache is saved, or at the
+        end of the build if it is only loaded"""
+        settings = self._get_cache_enabled_settings()
+        cacher = FileDataCacher(settings, "Test", True, True)
+        cacher.cache_data("a.rst", "a")
+        cacher.save_cache()
+        self.assertIsNone(cacher._cache._connection)
+
+        cacher = FileDataCacher(settings, "Test", False, True)
+        self.assertEqual(cacher.get_cached_data("a.rst"), "a")
+        self.assertIsNotNone(cacher._cache._connection)
+        cacher.save_cache()
+        self.assertIsNone(cacher._cache._connection)
+        # and opened again if needed
+        self.assertIsNone(cacher.get_cached_data("b.rst"))
+        cacher.close()
+        self.assertIsNone(cacher._cache._connection)
+
+    def test_highlight_cache_evicts_without_loading(self):
+        """Test that the highlighted code blocks are evicted by key, without
+        being loaded"""
+        settings = self._get_cache_enabled_settings()
+        cache = HighlightCache(settings)
+        for code in ("a = 1", "b = 2"):
+            cache.highlight(code, PythonLexer(), HtmlFormatter())
+        cache.save_cache()
+
+        for max_idle_builds, expected in ((1, 3), (0, 1)):
+            cache = HighlightCache(settings)
+            with patch.object(HighlightCache, "max_idle_builds", max_idle_builds):
+                with patch.object(
+                    cache._cache, "_loads", wraps=cache._cache._loads
+                ) as loads:
+                    cache.save_cache()
+            self.assertEqual(loads.call_count, 0)
+            self.assertEqual(len(SQLiteCache(cache._cache.path)), expected)
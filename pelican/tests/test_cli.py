@@ -1,3 +1,4 @@
+import os
 import unittest
 
 from pelican import get_config, parse_arguments
@@ -79,3 +80,47 @@ class TestGetConfigFromArgs(unittest.TestCase):
             "TRANSLATION_FEED_RSS_URL": "someurl",
         }
         self.assertDictEqual(config, {**config, **config_must_contain})
+
+    def test_jobs(self):
+        args = parse_arguments(["--jobs", "4"])
+        self.assertEqual(get_config(args)["READER_WORKERS"], 4)
+
+        args = parse_arguments([])
+        self.assertNotIn("READER_WORKERS", get_config(args))
+
+    def test_incremental(self):
+        args = parse_arguments(["--incremental"])
+        self.assertTrue(get_config(args)["INCREMENTAL_BUILD"])
+
+        args = parse_arguments([])
+        self.assertNotIn("INCREMENTAL_BUILD", get_config(args))
+
+    def test_profile(self):
+        args = parse_arguments(["--profile"])
+        self.assertTrue(
+            get_config(args)["PROFILE_PATH"].endswith("pelican-profile.json")
+        )
+
+        args = parse_arguments(["--profile", "build/profile.json"])
+        self.assertEqual(
+            get_config(args)["PROFILE_PATH"], os.path.abspath("build/profile.json")
+        )
+
+        args = parse_arguments([])
+        self.assertNotIn("PROFILE_PATH", get_config(args))
+
+    def test_trace(self):
+        args = parse_arguments(["--trace", "build.json"])
+        self.assertEqual(get_config(args)["TRACE_PATH"], os.path.abspath("build.json"))
+
+        args = parse_arguments([])
+        self.assertNotIn("TRACE_PATH", get_config(args))
+
+    def test_cache_stats(self):
+        args = parse_arguments(["--cache-stats", "stats.json"])
+        self.assertEqual(
+            get_config(args)["CACHE_STATS_PATH"], os.path.abspath("stats.json")
+        )
+
+        args = parse_arguments([])
+        self.assertNotIn("CACHE_STATS_PATH", get_config(args))
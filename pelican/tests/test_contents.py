@@ -2,12 +2,25 @@ import datetime
 import locale
 import logging
 import os.path
+import pickle
 from posixpath import join as posix_join
-from sys import platform
+from sys import getsizeof, platform
+from unittest.mock import patch
+from urllib.parse import urlparse
 
 from jinja2.utils import generate_lorem_ipsum
 
-from pelican.contents import Article, Author, Category, Page, Static, logger
+from pelican.contents import (
+    Article,
+    Author,
+    Category,
+    Page,
+    Static,
+    Tag,
+    _HTMLScan,
+    logger,
+)
+from pelican.links import LinkIndex
 from pelican.plugins.signals import content_object_init
 from pelican.settings import DEFAULT_CONFIG
 from pelican.tests.support import LoggedTestCase, get_context, get_settings, unittest
@@ -114,6 +127,44 @@ class TestPage(TestBase):
         page = Page(**page_kwargs)
         self.assertEqual(page.summary, "")
 
+    def test_summary_max_length_with_links(self):
+        # The offset of the summary, found in the content, is shifted by the
+        # links updated before it
+        page_kwargs = self._copy_page_kwargs()
+        settings = get_settings()
+        page_kwargs["settings"] = settings
+        del page_kwargs["metadata"]["summary"]
+        page_kwargs["content"] = (
+            '<p>One <a href="{tag}a-long-tag-name">two</a> <b>three</b> four'
+            ' <a href="{category}cat">five</a></p><p>six</p>'
+        )
+        page_kwargs["context"]["localsiteurl"] = "http://example.com"
+        for max_length in (1, 2, 3, 5, 6, 10):
+            settings["SUMMARY_MAX_LENGTH"] = max_length
+            page = Page(**page_kwargs)
+            self.assertEqual(
+                page.summary, truncate_html_words(page.content, max_length)
+            )
+
+    def test_html_scan(self):
+        # The links and images with an empty alt are found by a single scan
+        args = self.page_kwargs.copy()
+        args["content"] = (
+            '<img src="a.png" alt="">'
+            '<a href="{static}/b.png"><img alt="" src="{attach}/c.png"></a>'
+        )
+        with patch("pelican.contents._HTMLScan", wraps=_HTMLScan) as scan:
+            page = Page(**args)
+            self.assertEqual(page.get_empty_alt_images(), ["a.png", "{attach}/c.png"])
+            self.assertEqual(page.get_static_links(), {"b.png", "c.png"})
+            page.get_content("")
+        self.assertEqual(scan.call_count, 1)
+
+        page._content = '<img src="d.png" alt="">'
+        self.assertEqual(page.get_empty_alt_images(), ["d.png"])
+        self.assertEqual(page.get_static_links(), set())
+        self.assertEqual(page.get_content(""), '<img src="d.png" alt="">')
+
     def test_summary_paragraph(self):
         # If SUMMARY_MAX_PARAGRAPHS is set, the generated summary should
         # not exceed the given paragraph count.
@@ -323,6 +374,53 @@ class TestPage(TestBase):
             # will simply skip this test.
             unittest.skip(f"There is no locale {the_locale} in this system.")
 
+    def test_compact_attributes(self):
+        # The dates are formatted when first needed, the core attributes are
+        # kept out of the __dict__ and the metadata keys are shared
+        page_kwargs = self._copy_page_kwargs()
+        page_kwargs["metadata"]["date"] = datetime.datetime(2015, 9, 13)
+        page = Page(**page_kwargs)
+        other = Page(**page_kwargs)
+        self.assertEqual(page.locale_date, "Sun 13 September 2015")
+        self.assertFalse(hasattr(page, "locale_modified"))
+        self.assertNotIn("title", page.__dict__)
+        self.assertNotIn("metadata", page.__dict__)
+        self.assertEqual(page.title, "foo bar")
+        for key, other_key in zip(page.metadata, other.metadata):
+            self.assertIs(key, other_key)
+
+        page.locale_date = "13/09/2015"
+        self.assertEqual(page.locale_date, "13/09/2015")
+        copy = pickle.loads(pickle.dumps(other))
+        self.assertEqual(copy.locale_date, "Sun 13 September 2015")
+        self.assertEqual(copy.title, "foo bar")
+
+    def test_memory_footprint(self):
+        # Computing the derived attributes of contents, e.g. their urls, does
+        # not store more values in them or in their URL wrappers
+        settings = get_settings()
+        metadata = {
+            "title": "title",
+            "date": datetime.datetime(2015, 9, 13),
+            "category": Category("misc", settings),
+            "author": Author("me", settings),
+            "tags": [Tag("a", settings), Tag("b", settings)],
+        }
+        article = Article(TEST_CONTENT, metadata, settings, "article.md")
+        objects = (article, article.category, *article.authors, *article.tags)
+
+        def footprint():
+            return [(sorted(vars(obj)), getsizeof(vars(obj))) for obj in objects]
+
+        before = footprint()
+        self.assertEqual(article.url, "title.html")
+        self.assertEqual(article.save_as, "title.html")
+        self.assertEqual(article.locale_date, "Sun 13 September 2015")
+        for wrapper in objects[1:]:
+            self.assertTrue(wrapper.url)
+            self.assertTrue(wrapper.save_as)
+        self.assertEqual(footprint(), before)
+
     def test_template(self):
         # Pages default to page, metadata overwrites
         default_page = Page(**self.page_kwargs)
@@ -345,6 +443,23 @@ class TestPage(TestBase):
         Page(**self.page_kwargs)
         self.assertTrue(receiver_test_function.has_been_called)
 
+    def test_lazy_content(self):
+        # A callable content is only called when the content is needed, and
+        # before the object is pickled
+        calls = []
+
+        def content():
+            calls.append(None)
+            return TEST_CONTENT
+
+        args = self.page_kwargs.copy()
+        args["content"] = content
+        page = Page(**args)
+        self.assertEqual(calls, [])
+        self.assertEqual(pickle.loads(pickle.dumps(page))._content, TEST_CONTENT)
+        self.assertEqual(page.content, TEST_CONTENT)
+        self.assertEqual(len(calls), 1)
+
     def test_get_content(self):
         # Test that the content is updated with the relative links to
         # filenames, tags and categories.
@@ -687,6 +802,36 @@ class TestPage(TestBase):
             '<a href="http://notmyidea.org/images/poster.jpg">poster</a>',
         )
 
+    def test_intrasite_link_index(self):
+        """Test that the contents of a build share the resolution of links"""
+        article = type("_DummyArticle", (object,), {"url": "article.html"})
+
+        args = self.page_kwargs.copy()
+        args["settings"] = get_settings()
+        args["source_path"] = "content"
+        args["context"]["generated_content"] = {"article.rst": article}
+        args["context"]["link_index"] = LinkIndex()
+        args["content"] = (
+            '<a href="{filename}article.rst">a</a>'
+            '<a href="{filename}article.rst#b">b</a>'
+            '<a href="{filename}article.rst">c</a>'
+        )
+        first = Page(**args)
+        second = Page(**args)
+        self.assertIs(first.get_link_index(), second.get_link_index())
+
+        with patch("pelican.links.urlparse", wraps=urlparse) as parse:
+            first.get_content("http://notmyidea.org")
+            second.get_content("http://notmyidea.org")
+        # once for each of the two values and its html unescaped version
+        self.assertEqual(parse.call_count, 4)
+        self.assertEqual(
+            second.get_content("http://notmyidea.org"),
+            '<a href="http://notmyidea.org/article.html">a</a>'
+            '<a href="http://notmyidea.org/article.html#b">b</a>'
+            '<a href="http://notmyidea.org/article.html">c</a>',
+        )
+
     def test_multiple_authors(self):
         """Test article with multiple authors."""
         args = self.page_kwargs.copy()
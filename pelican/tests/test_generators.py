@@ -1,7 +1,7 @@
 import os
 from shutil import copy, rmtree
 from tempfile import mkdtemp
-from unittest.mock import MagicMock
+from unittest.mock import MagicMock, patch
 
 from pelican.generators import (
     ArticlesGenerator,
@@ -10,7 +10,10 @@ from pelican.generators import (
     PelicanTemplateNotFound,
     StaticGenerator,
     TemplatePagesGenerator,
+    TemplateRegistry,
 )
+from pelican.plugins import signals
+from pelican.readers import Readers
 from pelican.tests.support import (
     TestCaseWithCLocale,
     can_symlink,
@@ -100,6 +103,111 @@ class TestGenerator(TestCaseWithCLocale):
             "get_files() excluded a subdirectory by name, ignoring its path",
         )
 
+    def test_get_files_shares_inventory(self):
+        """Test that generators sharing a context list directories once."""
+        context = self.settings.copy()
+        generators = [
+            Generator(
+                context=context,
+                settings=self.settings,
+                path=os.path.join(CUR_DIR, "nested_content"),
+                theme=self.settings["THEME"],
+                output_path=None,
+            )
+            for _ in range(2)
+        ]
+        self.assertIs(generators[0].inventory, generators[1].inventory)
+
+        with patch("pelican.inventory.os.scandir", wraps=os.scandir) as scandir:
+            found = [generator.get_files(paths=[""]) for generator in generators]
+            generators[0]._check_disabled_readers([""], exclude=[])
+        self.assertEqual(found[0], found[1])
+        self.assertIn(os.path.join("maindir", "subdir", "subdir.md"), found[0])
+        listed = [call.args[0] for call in scandir.call_args_list]
+        self.assertEqual(len(listed), 3)
+        self.assertEqual(len(set(listed)), 3)
+
+    def test_template_registry_shared(self):
+        """Test that generators sharing a template registry share their
+        environment and templates."""
+        context = self.settings.copy()
+        context["template_registry"] = TemplateRegistry(
+            self.settings, self.settings["THEME"]
+        )
+        generators = [
+            Generator(context, self.settings, CUR_DIR, self.settings["THEME"], None)
+            for _ in range(2)
+        ]
+        self.assertIs(generators[0].env, generators[1].env)
+        with patch.object(
+            generators[0].env, "get_template", wraps=generators[0].env.get_template
+        ) as get_template:
+            templates = [generator.get_template("article") for generator in generators]
+        self.assertIs(templates[0], templates[1])
+        self.assertEqual(get_template.call_count, 1)
+
+        # a generator can still use its own environment
+        generators[1].env = generators[1].env.overlay()
+        self.assertIsNot(generators[1].get_template("article"), templates[0])
+        self.assertIs(generators[0].get_template("article"), templates[0])
+
+    def test_readers_shared(self):
+        """Test that generators sharing readers do not construct them again,
+        and keep their own reader-level cache."""
+        context = self.settings.copy()
+        with patch("pelican.readers.signals.readers_init.send") as readers_init:
+            context["readers"] = Readers(self.settings)
+            generators = [
+                cls(context, self.settings, CUR_DIR, self.settings["THEME"], None)
+                for cls in (ArticlesGenerator, PagesGenerator)
+            ]
+        self.assertEqual(readers_init.call_count, 1)
+        first, second = (generator.readers for generator in generators)
+        self.assertIs(first.readers, second.readers)
+        self.assertIs(first.readers, context["readers"].readers)
+        self.assertIsNot(first._cache, second._cache)
+        self.assertEqual(first.stats.name, "ArticlesGenerator-Readers")
+        self.assertEqual(second.stats.name, "PagesGenerator-Readers")
+
+    def test_template_list_only_in_debug(self):
+        with patch("pelican.generators.Environment.list_templates") as list_templates:
+            TemplateRegistry(self.settings, self.settings["THEME"])
+            self.assertEqual(list_templates.call_count, 0)
+            with self.assertLogs("pelican.generators", "DEBUG"):
+                TemplateRegistry(self.settings, self.settings["THEME"])
+            self.assertEqual(list_templates.call_count, 1)
+
+    def test_bytecode_cache(self):
+        """Test that compiled templates are cached when caching content."""
+        temp_cache = mkdtemp(prefix="pelican_cache.")
+        self.addCleanup(rmtree, temp_cache)
+        self.settings["CACHE_PATH"] = temp_cache
+
+        def compiled_templates(**settings):
+            generator = Generator(
+                self.settings.copy(),
+                {**self.settings, **settings},
+                CUR_DIR,
+                self.settings["THEME"],
+                None,
+            )
+            with patch.object(
+                generator.env, "compile", wraps=generator.env.compile
+            ) as compile_template:
+                generator.get_template("article")
+            return compile_template.call_count
+
+        self.assertEqual(compiled_templates(CACHE_CONTENT=False), 1)
+        self.assertEqual(os.listdir(temp_cache), [])
+        self.assertEqual(compiled_templates(CACHE_CONTENT=True), 1)
+        self.assertEqual(compiled_templates(CACHE_CONTENT=True), 0)
+        self.assertEqual(
+            compiled_templates(CACHE_CONTENT=True, JINJA_BYTECODE_CACHE=False), 1
+        )
+        self.assertEqual(
+            compiled_templates(CACHE_CONTENT=False, JINJA_BYTECODE_CACHE=True), 0
+        )
+
     def test_custom_jinja_environment(self):
         """
         Test that setting the JINJA_ENVIRONMENT
@@ -372,6 +480,57 @@ class TestArticlesGenerator(unittest.TestCase):
         ]
         self.assertEqual(sorted(articles_expected), sorted(self.articles))
 
+    def test_generate_context_with_reader_workers(self):
+        settings = get_settings()
+        settings["DEFAULT_CATEGORY"] = "Default"
+        settings["DEFAULT_DATE"] = (1970, 1, 1)
+        settings["READERS"] = {"asc": None}
+        settings["READER_WORKERS"] = 2
+        generator = ArticlesGenerator(
+            context=get_context(settings),
+            settings=settings,
+            path=CONTENT_DIR,
+            theme=settings["THEME"],
+            output_path=None,
+        )
+        generator.generate_context()
+
+        self.assertEqual(
+            sorted(self.articles), sorted(self.distill_articles(generator.articles))
+        )
+        self.assertEqual(
+            sorted(self.drafts), sorted(self.distill_articles(generator.drafts))
+        )
+        self.assertEqual(generator.readers._prefetched, {})
+
+    def test_reader_workers_disabled_by_preread_receivers(self):
+        settings = get_settings()
+        settings["DEFAULT_CATEGORY"] = "Default"
+        settings["DEFAULT_DATE"] = (1970, 1, 1)
+        settings["READERS"] = {"asc": None}
+        settings["READER_WORKERS"] = 2
+        generator = ArticlesGenerator(
+            context=get_context(settings),
+            settings=settings,
+            path=CONTENT_DIR,
+            theme=settings["THEME"],
+            output_path=None,
+        )
+
+        def preread(sender):
+            pass
+
+        signals.article_generator_preread.connect(preread)
+        try:
+            with patch.object(generator.readers, "prefetch") as prefetch:
+                generator.generate_context()
+        finally:
+            signals.article_generator_preread.disconnect(preread)
+        prefetch.assert_not_called()
+        self.assertEqual(
+            sorted(self.articles), sorted(self.distill_articles(generator.articles))
+        )
+
     def test_articles_draft(self):
         draft_articles_expected = [
             ["Draft article", "draft", "Default", "article"],
@@ -814,6 +973,35 @@ class TestArticlesGenerator(unittest.TestCase):
         ]
         self.assertEqual(sorted(authors), sorted(authors_expected))
 
+    def test_taxonomy_dates(self):
+        """The dates of the tag, category and author pages, and the articles
+        of the period archives, keep the order of the full lists."""
+        generator = self.generator
+        for generate, groups in (
+            (generator.generate_tags, generator.tags.items()),
+            (generator.generate_categories, generator.categories),
+            (generator.generate_authors, generator.authors),
+        ):
+            write = MagicMock()
+            generate(write)
+            self.assertEqual(write.call_count, len(groups))
+            for call, (_, articles) in zip(write.call_args_list, groups):
+                self.assertIs(call.kwargs["articles"], articles)
+                expected = [a for a in generator.dates if a in articles]
+                self.assertEqual(call.kwargs["dates"], expected)
+
+        settings = get_settings()
+        for granularity in "YEAR", "MONTH", "DAY":
+            settings[f"{granularity}_ARCHIVE_SAVE_AS"] = granularity + "/index.html"
+        period_archives = generator._build_period_archives(
+            generator.dates, generator.articles, settings
+        )
+        self.assertTrue(period_archives["day"])
+        for periods in period_archives.values():
+            for archive in periods:
+                expected = [a for a in generator.articles if a in archive["dates"]]
+                self.assertEqual(archive["articles"], expected)
+
     def test_standard_metadata_in_default_metadata(self):
         settings = get_settings()
         settings["CACHE_CONTENT"] = False
@@ -1,5 +1,6 @@
 import contextlib
 import io
+import json
 import locale
 import logging
 import os
@@ -7,15 +8,16 @@ import subprocess
 import sys
 import unittest
 from collections.abc import Sequence
-from shutil import rmtree
+from shutil import copytree, rmtree
 from tempfile import TemporaryDirectory, mkdtemp
 from unittest.mock import PropertyMock, patch
 
 from rich.console import Console
 
 import pelican.readers
-from pelican import Pelican, __version__, main
-from pelican.generators import StaticGenerator
+from pelican import Pelican, __version__, get_config, main, parse_arguments
+from pelican.generators import ArticlesGenerator, StaticGenerator
+from pelican.plugins import signals
 from pelican.settings import read_settings
 from pelican.tests.support import (
     LoggedTestCase,
@@ -48,6 +50,10 @@ def recursiveDiff(dcmp):
     return diff
 
 
+def count_articles(article_generator):
+    article_generator.context["article_count"] = len(article_generator.articles)
+
+
 class TestPelican(LoggedTestCase):
     # general functional testing for pelican. Basically, this test case tries
     # to run pelican in different situations and see how it behaves
@@ -137,6 +143,205 @@ class TestPelican(LoggedTestCase):
         mute(True)(pelican.run)()
         self.assertDirsEqual(self.temp_path, os.path.join(OUTPUT_PATH, "custom"))
 
+    @skipIfNoExecutable(["git", "--version"])
+    def test_parallel_writer_generation_works(self):
+        # rendering in worker processes should produce the very same output
+        # and signals as rendering in the main process
+        written = []
+
+        def record(path, context):
+            written.append(path)
+
+        signals.content_written.connect(record)
+        self.addCleanup(signals.content_written.disconnect, record)
+
+        output_paths = {}
+        outputs = {}
+        for workers in (1, 2):
+            output_paths[workers] = output_path = mkdtemp(prefix="pelicantests.")
+            self.addCleanup(rmtree, output_path)
+            settings = read_settings(
+                path=SAMPLE_CONFIG,
+                override={
+                    "PATH": INPUT_PATH,
+                    "OUTPUT_PATH": output_path,
+                    "CACHE_PATH": self.temp_cache,
+                    "LOCALE": locale.normalize("en_US.UTF-8"),
+                    "WRITER_WORKERS": workers,
+                },
+            )
+            pelican = Pelican(settings=settings)
+            mute(True)(pelican.run)()
+            outputs[workers] = [os.path.relpath(path, output_path) for path in written]
+            written.clear()
+
+        self.assertDirsEqual(output_paths[1], output_paths[2])
+        self.assertEqual(outputs[1], outputs[2])
+
+    def test_profile(self):
+        profile_path = os.path.join(self.temp_cache, "profile.json")
+        settings = read_settings(
+            path=SAMPLE_CONFIG,
+            override={
+                "PATH": INPUT_PATH,
+                "OUTPUT_PATH": self.temp_path,
+                "CACHE_PATH": self.temp_cache,
+                "PROFILE_PATH": profile_path,
+            },
+        )
+        pelican = Pelican(settings=settings)
+        output = list(mute(True)(pelican.run)())
+        self.assertIn("Slowest", output)
+
+        with open(profile_path) as f:
+            profile = json.load(f)
+        phases = {(p["phase"], p["generator"]) for p in profile["phases"]}
+        self.assertIn(("generate_context", "ArticlesGenerator"), phases)
+        self.assertIn(("generate_output", "PagesGenerator"), phases)
+        self.assertIn(("all_generators_finalized", None), phases)
+        self.assertEqual(profile["readers"]["MarkdownReader"]["files"], 1)
+        self.assertIn("article.html", profile["templates"])
+        files = {(f["kind"], f["path"], f["by"]) for f in profile["files"]}
+        self.assertIn(("read", "unbelievable.rst", "RstReader"), files)
+        self.assertIn(("render", "unbelievable.html", "article.html"), files)
+        self.assertIn(("render", "feeds/all.atom.xml", "atom feed"), files)
+        self.assertEqual(len(profile["slowest"]), 10)
+
+    def test_trace(self):
+        trace_path = os.path.join(self.temp_cache, "trace.json")
+        settings = read_settings(
+            path=SAMPLE_CONFIG,
+            override={
+                "PATH": INPUT_PATH,
+                "OUTPUT_PATH": self.temp_path,
+                "CACHE_PATH": self.temp_cache,
+                "TRACE_PATH": trace_path,
+            },
+        )
+        signals.article_generator_finalized.connect(count_articles)
+        try:
+            pelican = Pelican(settings=settings)
+            mute(True)(pelican.run)()
+        finally:
+            signals.article_generator_finalized.disconnect(count_articles)
+        self.assertNotIn("send", vars(signals.article_generator_finalized))
+
+        with open(trace_path) as f:
+            events = json.load(f)["traceEvents"]
+        spans = {(e["cat"], e["name"]) for e in events if e["ph"] == "X"}
+        self.assertIn(("phase", "ArticlesGenerator.generate_context"), spans)
+        self.assertIn(("generator", "ArticlesGenerator.generate_feeds"), spans)
+        self.assertIn(("reader", "Readers.read_file"), spans)
+        self.assertIn(("read", "RstReader.read"), spans)
+        self.assertIn(("writer", "Writer.write_file"), spans)
+        self.assertIn(("render", "article.html"), spans)
+        self.assertIn(("signal", "article_generator_finalized"), spans)
+        receivers = [e for e in events if e.get("cat") == "receiver"]
+        self.assertEqual(len(receivers), 1)
+        self.assertEqual(receivers[0]["name"], "count_articles")
+        self.assertEqual(
+            receivers[0]["args"],
+            {"signal": "article_generator_finalized", "module": __name__},
+        )
+
+    def test_trace_stopped_on_error(self):
+        settings = read_settings(
+            path=SAMPLE_CONFIG,
+            override={
+                "PATH": INPUT_PATH,
+                "OUTPUT_PATH": self.temp_path,
+                "CACHE_PATH": self.temp_cache,
+                "TRACE_PATH": os.path.join(self.temp_cache, "trace.json"),
+            },
+        )
+        pelican = Pelican(settings=settings)
+        with patch.object(
+            ArticlesGenerator, "generate_output", side_effect=RuntimeError
+        ):
+            with self.assertRaises(RuntimeError):
+                mute(True)(pelican.run)()
+        self.assertNotIn("send", vars(signals.article_generator_finalized))
+        self.assertNotIn("send", vars(signals.finalized))
+
+    def test_incremental_build_skips_unchanged_files(self):
+        content_path = os.path.join(self.temp_cache, "content")
+        copytree(INPUT_PATH, content_path)
+        settings = read_settings(
+            path=SAMPLE_CONFIG,
+            override={
+                "PATH": content_path,
+                "OUTPUT_PATH": self.temp_path,
+                "CACHE_PATH": self.temp_cache,
+                "INCREMENTAL_BUILD": True,
+            },
+        )
+
+        def run(**override):
+            pelican = Pelican(settings={**settings, **override})
+            mute(True)(pelican.run)()
+            return {
+                os.path.relpath(os.path.join(root, name), self.temp_path): os.stat(
+                    os.path.join(root, name)
+                ).st_mtime_ns
+                for root, _, files in os.walk(self.temp_path)
+                for name in files
+                if name.endswith((".html", ".xml"))
+            }
+
+        first = run()
+        second = run()
+        # files written several times by a build, like tag/oh.html which a
+        # page overrides, are never skipped
+        self.assertEqual(
+            {path for path in second if second[path] != first[path]},
+            {"tag/oh.html"},
+        )
+
+        with open(os.path.join(content_path, "unbelievable.rst"), "a") as f:
+            f.write("\nOne more paragraph.\n")
+        third = run()
+        changed = {path for path in third if third[path] != second[path]}
+        self.assertIn("unbelievable.html", changed)
+        self.assertIn("index.html", changed)
+        self.assertIn("category/misc.html", changed)
+        self.assertIn("feeds/all.atom.xml", changed)
+        self.assertNotIn("oh-yeah.html", changed)
+        self.assertNotIn("category/bar.html", changed)
+
+        with open(os.path.join(self.temp_path, "unbelievable.html")) as f:
+            self.assertIn("One more paragraph.", f.read())
+
+        # --ignore-cache writes every file again
+        fourth = run(LOAD_CONTENT_CACHE=False)
+        self.assertEqual(
+            {path for path in fourth if fourth[path] == third[path]}, set()
+        )
+
+    def test_incremental_option(self):
+        # --incremental skips unchanged files with the default settings
+        def run(*options):
+            args = parse_arguments(
+                [INPUT_PATH, "-o", self.temp_path, "--cache-path", self.temp_cache]
+                + list(options)
+            )
+            pelican = Pelican(settings=read_settings(override=get_config(args)))
+            mute(True)(pelican.run)()
+            return {
+                os.path.join(root, name): os.stat(os.path.join(root, name)).st_mtime_ns
+                for root, _, files in os.walk(self.temp_path)
+                for name in files
+                if name.endswith(".html")
+            }
+
+        first = run("--incremental")
+        second = run("--incremental")
+        rewritten = {path for path in second if second[path] != first[path]}
+        # but tag/oh.html, written twice as a page overrides it
+        self.assertEqual(rewritten, {os.path.join(self.temp_path, "tag", "oh.html")})
+
+        third = run("--incremental", "--ignore-cache")
+        self.assertEqual({path for path in third if third[path] == second[path]}, set())
+
     @skipIfNoExecutable(["git", "--version"])
     @unittest.skipUnless(
         locale_available("fr_FR.UTF-8") or locale_available("French"),
@@ -123,6 +123,27 @@ class DefaultReaderTest(ReaderTest):
 
         self.assertDictHasSubset(page.metadata, expected)
 
+    def test_readfile_metadata_only(self):
+        # the content is only converted when it is first needed
+        for path in (
+            "article_with_metadata.rst",
+            "article_with_markdown_and_footnote.md",
+            "article_with_metadata.html",
+        ):
+            with self.subTest(path=path):
+                page = self.read_file(path=path)
+                r = readers.Readers(settings=get_settings())
+                reader = r.readers[path.rsplit(".", 1)[1]]
+                with patch.object(reader, "read", wraps=reader.read) as read:
+                    lazy_page = r.read_file(
+                        base_path=CONTENT_PATH, path=path, metadata_only=True
+                    )
+                    self.assertEqual(lazy_page.metadata, page.metadata)
+                    self.assertEqual(read.call_count, 0)
+                    self.assertEqual(lazy_page.content, page.content)
+                    self.assertEqual(lazy_page.summary, page.summary)
+                    self.assertEqual(read.call_count, 1)
+
     def test_find_empty_alt(self):
         with patch("pelican.readers.logger") as log_mock:
             content = [
@@ -141,6 +162,22 @@ class DefaultReaderTest(ReaderTest):
 
 
 class RstReaderTest(ReaderTest):
+    def test_components_reused(self):
+        # docutils settings, parser and writer are prepared once per reader
+        reader = readers.RstReader(settings=get_settings())
+        with patch.object(
+            readers.docutils.core.Publisher,
+            "process_programmatic_settings",
+            autospec=True,
+            side_effect=readers.docutils.core.Publisher.process_programmatic_settings,
+        ) as process_settings:
+            content, metadata = reader.read(_path("article_with_metadata.rst"))
+            self.assertEqual(metadata["title"], "This is a super article !")
+            content, metadata = reader.read(_path("article.rst"))
+        self.assertEqual(process_settings.call_count, 1)
+        self.assertEqual(metadata["title"], "Article title")
+        self.assertNotIn("super article", content)
+
     def test_article_with_metadata(self):
         page = self.read_file(path="article_with_metadata.rst")
         expected = {
@@ -652,6 +689,18 @@ class MdReaderTest(ReaderTest):
         }
         self.assertDictHasSubset(metadata, expected)
 
+    def test_converters_reused(self):
+        # One converter for documents and one for metadata fields are built
+        # on the first read and reset for every following file
+        reader = readers.MarkdownReader(settings=get_settings())
+        with patch("pelican.readers.Markdown", wraps=readers.Markdown) as md:
+            reader.read(_path("article_with_markdown_and_footnote.md"))
+            content, metadata = reader.read(_path("article_with_md_extension.md"))
+        self.assertEqual(md.call_count, 2)
+        self.assertEqual(metadata["title"], "Test md File")
+        self.assertEqual(metadata["summary"], "<p>I have a lot to test</p>")
+        self.assertNotIn("footnote", content)
+
     def test_article_with_footnote(self):
         settings = get_settings()
         ec = settings["MARKDOWN"]["extension_configs"]
@@ -901,11 +950,13 @@ class MdReaderTest(ReaderTest):
         md_filename = "article_with_markdown_and_empty_tags.md"
 
         r = readers.Readers(
-            cache_name="cache", settings=get_settings(CACHE_CONTENT=True)
+            cache_name="cache",
+            settings=get_settings(CACHE_CONTENT=True, PATH=CONTENT_PATH),
         )
         page = r.read_file(base_path=CONTENT_PATH, path=md_filename)
 
-        __, cached_metadata = r.get_cached_data(_path(md_filename), (None, None))
+        # files are cached by their path relative to PATH
+        __, cached_metadata = r.get_cached_data(md_filename, (None, None))
 
         expected = {"title": "Article with markdown and empty tags"}
         self.assertEqual(cached_metadata, expected)
@@ -1025,3 +1076,79 @@ class HTMLReaderTest(ReaderTest):
             "title": "Article with an inline SVG",
         }
         self.assertDictHasSubset(page.metadata, expected)
+
+
+class PathMetadataMatcherTest(unittest.TestCase):
+    @staticmethod
+    def linear_extra_path_metadata(source_path, epm):
+        # what path_metadata() did before PathMetadataMatcher
+        metadata = {}
+        for path, meta in sorted(epm.items()):
+            dirpath = os.path.join(path, "")
+            if source_path == path or source_path.startswith(dirpath):
+                metadata.update(meta)
+        return metadata
+
+    def test_extra_path_metadata(self):
+        epm = {
+            "": {"root": "yes"},
+            "images": {"kind": "image"},
+            "images/": {"gallery": "all"},
+            "images/2024": {"year": "2024"},
+            "images/2024/cover.png": {"kind": "cover"},
+            "images/20": {"year": "wrong"},
+            "pages/about.md": {"menu": "yes"},
+        }
+        matcher = readers.PathMetadataMatcher({"EXTRA_PATH_METADATA": epm})
+        for path in (
+            "images",
+            "images/logo.png",
+            "images/2024/cover.png",
+            "images/2024/other.png",
+            "images/2025/cover.png",
+            "pages/about.md",
+            "pages/about.md.bak",
+            "other.md",
+        ):
+            with self.subTest(path=path):
+                self.assertEqual(
+                    matcher.extra_path_metadata(path),
+                    self.linear_extra_path_metadata(path, epm),
+                )
+
+    def test_lookup_steps(self):
+        # A site attaching metadata to each of its image directories: the
+        # lookups must not depend on the number of entries, but only on the
+        # number of components of the path
+        epm = {
+            f"images/{year}/{month:02}/{album}": {"album": f"{year}-{month}-{album}"}
+            for year in range(2000, 2025)
+            for month in range(1, 13)
+            for album in range(10)
+        }
+        paths = [
+            f"images/{2000 + i % 25}/{i % 12 + 1:02}/{i % 10}/{i}.jpg"
+            for i in range(100)
+        ]
+
+        class CountingDict(dict):
+            lookups = 0
+
+            def get(self, key, default=None):
+                CountingDict.lookups += 1
+                return super().get(key, default)
+
+        def count_lookups(node):
+            node.children = CountingDict(node.children)
+            for child in node.children.values():
+                count_lookups(child)
+
+        matcher = readers.PathMetadataMatcher({"EXTRA_PATH_METADATA": epm})
+        count_lookups(matcher._root)
+        matched = [matcher.extra_path_metadata(path) for path in paths]
+
+        self.assertEqual(
+            matched, [self.linear_extra_path_metadata(path, epm) for path in paths]
+        )
+        # rather than checking the 3000 entries for each path
+        self.assertEqual(CountingDict.lookups, 5 * len(paths))
@@ -108,6 +108,19 @@ class TestSettingsConfiguration(unittest.TestCase):
         configure_settings(settings)
         self.assertEqual(settings["FEED_DOMAIN"], "http://feeds.example.com")
 
+    def test_invalid_cache_backend(self):
+        settings = {
+            "PATH": os.curdir,
+            "THEME": DEFAULT_THEME,
+            "CACHE_BACKEND": "shelve",
+        }
+        configure_settings(settings)
+        self.assertEqual(settings["CACHE_BACKEND"], "pickle")
+
+        settings["CACHE_BACKEND"] = "sqlite"
+        configure_settings(settings)
+        self.assertEqual(settings["CACHE_BACKEND"], "sqlite")
+
     def test_theme_settings_exceptions(self):
         settings = self.settings
 
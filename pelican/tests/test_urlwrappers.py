@@ -94,3 +94,18 @@ class TestURLWrapper(unittest.TestCase):
         self.assertEqual(author1.slug, "mr-senko")
         self.assertEqual(author2.slug, "atodorov")
         self.assertEqual(author3.slug, "krasimir")
+
+    def test_url_fields(self):
+        # The URL settings are formatted with the attributes of the wrappers,
+        # without adding them to their __dict__
+        settings = {
+            "TAG_URL": "tag/{slug}/{description}.html",
+            "TAG_SAVE_AS": "tag/{name}/{url}.html",
+        }
+        tag = Tag("Foo", settings=settings)
+        tag.description = "about"
+        self.assertEqual(tag.url, "tag/foo/about.html")
+        self.assertEqual(tag.as_dict()["name"], "Foo")
+        self.assertNotIn("slug", tag.__dict__)
+        with self.assertRaises(KeyError):
+            tag.save_as  # noqa: B018
@@ -1,3 +1,4 @@
+import gc
 import locale
 import logging
 import os
@@ -986,6 +987,35 @@ class TestMemoized(unittest.TestCase):
             self.assertEqual("bar", container.get("bar"))
             get_mock.assert_called_once_with("bar")
 
+    def test_memoized_per_instance(self):
+        class Container:
+            def __init__(self):
+                self.calls = 0
+
+            @utils.memoized(maxsize=2)
+            def get(self, key):
+                self.calls += 1
+                return key * 2
+
+        first, second = Container(), Container()
+        for key in ("a", "b", "a", "c"):
+            first.get(key)
+        second.get("a")
+        # "b", least recently used, was evicted from the values of first
+        self.assertEqual(list(first.get.cache), [("a",), ("c",)])
+        self.assertEqual(first.calls, 3)
+        self.assertEqual(second.calls, 1)
+        self.assertEqual(Container.get.footprint()[0], 3)
+
+        Container.get.invalidate(first)
+        first.get("a")
+        self.assertEqual(first.calls, 4)
+
+        # the values do not keep the instances alive
+        del first, second
+        gc.collect()
+        self.assertEqual(Container.get.footprint(), (0, 0))
+
 
 class TestStringUtils(unittest.TestCase):
     def test_file_suffix(self):
@@ -2,6 +2,7 @@ import functools
 import logging
 import os
 import pathlib
+import sys
 
 from pelican.utils import slugify
 
@@ -12,7 +13,8 @@ logger = logging.getLogger(__name__)
 class URLWrapper:
     def __init__(self, name, settings):
         self.settings = settings
-        self._name = name
+        # the same few names are used by many contents
+        self._name = sys.intern(name) if type(name) is str else name
         self._slug = None
         self._slug_from_name = True
 
@@ -36,11 +38,13 @@ class URLWrapper:
                 class_key, self.settings.get("SLUG_REGEX_SUBSTITUTIONS", [])
             )
             preserve_case = self.settings.get("SLUGIFY_PRESERVE_CASE", False)
-            self._slug = slugify(
-                self.name,
-                regex_subs=regex_subs,
-                preserve_case=preserve_case,
-                use_unicode=self.settings.get("SLUGIFY_USE_UNICODE", False),
+            self._slug = sys.intern(
+                slugify(
+                    self.name,
+                    regex_subs=regex_subs,
+                    preserve_case=preserve_case,
+                    use_unicode=self.settings.get("SLUGIFY_USE_UNICODE", False),
+                )
             )
         return self._slug
 
@@ -51,7 +55,7 @@ class URLWrapper:
         self._slug = slug
 
     def as_dict(self):
-        d = self.__dict__
+        d = self.__dict__.copy()
         d["name"] = self.name
         d["slug"] = self.slug
         return d
@@ -116,9 +120,9 @@ class URLWrapper:
             logger.warning("%s is set to %s", setting, value)
             return value
         elif get_page_name:
-            return os.path.splitext(value)[0].format(**self.as_dict())
+            return os.path.splitext(value)[0].format_map(_URLFields(self))
         else:
-            return value.format(**self.as_dict())
+            return value.format_map(_URLFields(self))
 
     page_name = property(
         functools.partial(_from_settings, key="URL", get_page_name=True)
@@ -127,6 +131,25 @@ class URLWrapper:
     save_as = property(functools.partial(_from_settings, key="SAVE_AS"))
 
 
+class _URLFields:
+    """The fields of the URL settings of a wrapper, i.e. the items of its
+    as_dict(), looked up in its attributes: building a dict of them would
+    keep a __dict__ attached to every wrapper."""
+
+    __slots__ = ("wrapper",)
+
+    def __init__(self, wrapper):
+        self.wrapper = wrapper
+
+    def __getitem__(self, key):
+        if key not in ("name", "slug") and hasattr(type(self.wrapper), key):
+            raise KeyError(key)
+        try:
+            return getattr(self.wrapper, key)
+        except AttributeError:
+            raise KeyError(key) from None
+
+
 class Category(URLWrapper):
     pass
 
@@ -12,7 +12,8 @@ import sys
 import traceback
 import unicodedata
 import urllib
-from collections.abc import Collection, Generator, Hashable, Iterable, Sequence
+import weakref
+from collections import OrderedDict
 from contextlib import contextmanager
 from functools import partial
 from html import entities
@@ -37,6 +38,8 @@ import watchfiles
 from markupsafe import Markup
 
 if TYPE_CHECKING:
+    from collections.abc import Collection, Generator, Iterable, Sequence
+
     from pelican.contents import Content
     from pelican.settings import Settings
 
@@ -144,35 +147,103 @@ class memoized:
     """Function decorator to cache return values.
 
     If called later with the same arguments, the cached value is returned
-    (not reevaluated).
+    (not reevaluated). The values of a method are stored for each instance,
+    in a mapping which does not keep the instance alive, so that they are
+    dropped along with it.
+
+    Use ``@memoized(maxsize=n)`` to keep at most *n* values (per instance
+    for a method), evicting the least recently used ones first.
+
+    The ``cache`` attribute of the decorated function, or of the bound
+    method, is the dict of its values; clear it, or call ``invalidate(obj)``
+    on the decorator, to have them computed again.
 
     """
 
-    def __init__(self, func: Callable) -> None:
+    def __new__(cls, func: Callable | None = None, *, maxsize: int | None = None):
+        if func is None:
+            return partial(cls, maxsize=maxsize)
+        return super().__new__(cls)
+
+    def __init__(self, func: Callable, *, maxsize: int | None = None) -> None:
         self.func = func
-        self.cache: dict[Any, Any] = {}
+        self.maxsize = maxsize
+        self.cache: OrderedDict[Any, Any] = OrderedDict()
+        # instance => OrderedDict of the values of the method
+        self._instance_caches: weakref.WeakKeyDictionary[Any, OrderedDict] = (
+            weakref.WeakKeyDictionary()
+        )
 
     def __call__(self, *args) -> Any:
-        if not isinstance(args, Hashable):
+        return self._lookup(self.cache, self.func, args)
+
+    def _lookup(self, cache: OrderedDict, func: Callable, args: tuple) -> Any:
+        try:
+            value = cache[args]
+        except KeyError:
+            pass
+        except TypeError:
             # uncacheable. a list, for instance.
             # better to not cache than blow up.
-            return self.func(*args)
-        if args in self.cache:
-            return self.cache[args]
+            return func(*args)
         else:
-            value = self.func(*args)
-            self.cache[args] = value
+            if self.maxsize is not None:
+                cache.move_to_end(args)
             return value
+        value = cache[args] = func(*args)
+        if self.maxsize is not None and len(cache) > self.maxsize:
+            cache.popitem(last=False)
+        return value
 
     def __repr__(self) -> str | None:
         return self.func.__doc__
 
-    def __get__(self, obj: Any, objtype):
+    def __get__(self, obj: Any, objtype=None):
         """Support instance methods."""
-        fn = partial(self.__call__, obj)
-        fn.cache = self.cache
+        if obj is None:
+            return self
+        try:
+            cache = self._instance_caches.get(obj)
+            if cache is None:
+                cache = self._instance_caches[obj] = OrderedDict()
+        except TypeError:
+            # not weakly referenceable, or not hashable: store the values
+            # with those of the function
+            fn = partial(self.__call__, obj)
+            fn.cache = self.cache
+            return fn
+        method = partial(self.func, obj)
+
+        def fn(*args):
+            return self._lookup(cache, method, args)
+
+        fn.cache = cache
         return fn
 
+    def invalidate(self, obj: Any) -> None:
+        """Forget the values of the method for the instance *obj*."""
+        try:
+            self._instance_caches.pop(obj, None)
+        except TypeError:
+            pass
+
+    def cache_clear(self) -> None:
+        """Forget all the values."""
+        self.cache.clear()
+        self._instance_caches.clear()
+
+    def footprint(self) -> tuple[int, int]:
+        """Return the number of values kept and their approximate size, with
+        their arguments, in bytes."""
+        caches = [self.cache, *list(self._instance_caches.values())]
+        entries = sum(len(cache) for cache in caches)
+        size = sum(
+            sys.getsizeof(args) + sys.getsizeof(value)
+            for cache in caches
+            for args, value in cache.items()
+        )
+        return entries, size
+
 
 def deprecated_attribute(
     old: str,
@@ -612,15 +683,29 @@ def truncate_html_words(s: str, num: int, end_text: str = "…") -> str:
     length = int(num)
     if length <= 0:
         return ""
-    truncator = _HTMLWordTruncator(length)
+    truncate_at, open_tags = find_html_truncation(s, length)
+    return close_html_truncation(s, truncate_at, open_tags, end_text)
+
+
+def find_html_truncation(s: str, num: int) -> tuple[int | None, list[str]]:
+    """Return the offset in the HTML *s* after *num* words, None if it has
+    fewer words, and the tags still open at that offset."""
+    truncator = _HTMLWordTruncator(num)
     truncator.feed(s)
-    if truncator.truncate_at is None:
+    return truncator.truncate_at, truncator.open_tags
+
+
+def close_html_truncation(
+    s: str, truncate_at: int | None, open_tags: list[str], end_text: str = "…"
+) -> str:
+    """Truncate the HTML *s* at an offset returned by find_html_truncation()"""
+    if truncate_at is None:
         return s
-    out = s[: truncator.truncate_at]
+    out = s[:truncate_at]
     if end_text:
         out += " " + end_text
     # Close any tags still open
-    for tag in truncator.open_tags:
+    for tag in open_tags:
         out += f"</{tag}>"
     # Return string
     return out
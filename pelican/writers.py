@@ -1,11 +1,16 @@
 import logging
+import multiprocessing
 import os
+from concurrent.futures import ProcessPoolExecutor
 from posixpath import join as posix_join
 from urllib.parse import urljoin
 
 from feedgenerator import Atom1Feed, Rss201rev2Feed, get_tag_uri
 from markupsafe import Markup
 
+from pelican import profiling
+from pelican.cache import BuildGraph
+from pelican.contents import Content
 from pelican.paginator import Paginator
 from pelican.plugins import signals
 from pelican.utils import (
@@ -25,6 +30,10 @@ class Writer:
         self.settings = settings or {}
         self._written_files = set()
         self._overridden_files = set()
+        if self.settings.get("INCREMENTAL_BUILD"):
+            self.build_graph = BuildGraph(self.settings)
+        else:
+            self.build_graph = None
 
         # See Content._link_replacer for details
         if self.settings.get("RELATIVE_URLS"):
@@ -105,6 +114,37 @@ class Writer:
         Exit if we have already written to that file, unless one (and no more
         than one) of the writes has the override parameter set to True.
         """
+        filename = self._get_write_target(filename, override)
+        return open(filename, "w", encoding=encoding)
+
+    def _is_up_to_date(self, path, context, localcontext=None, template=None, **extra):
+        """Return True if an incremental build can skip writing *path*,
+        because it was generated from the same inputs by the previous build.
+
+        Files written more than once by this build are never skipped.
+        """
+        if self.build_graph is None or path in self._written_files:
+            return False
+        if localcontext is not None:
+            dependencies = self.build_graph.get_dependencies(localcontext)
+            # the variables specific to this file, e.g. the tag of a tag page
+            extra.update(
+                (key, value)
+                for key, value in localcontext.items()
+                if key not in context or value is not context[key]
+            )
+        else:
+            dependencies = extra.pop("elements")
+        return self.build_graph.is_up_to_date(
+            path, context, dependencies, template=template, extra=extra
+        )
+
+    def _get_write_target(self, filename, override=False):
+        """Record a write to the given file and return the file to actually
+        write to: the file itself, or os.devnull if the write is to be skipped.
+
+        See _open_w() for the rules regarding files written more than once.
+        """
         if filename in self._overridden_files:
             if override:
                 raise RuntimeError(f"File {filename} is set to be overridden twice")
@@ -118,8 +158,9 @@ class Writer:
         if override:
             self._overridden_files.add(filename)
         self._written_files.add(filename)
-        return open(filename, "w", encoding=encoding)
+        return filename
 
+    @profiling.traced("writer", arg="path")
     def write_feed(
         self,
         elements,
@@ -151,11 +192,13 @@ class Writer:
         self.feed_domain = context.get("FEED_DOMAIN")
         self.feed_url = self.urljoiner(self.feed_domain, url or path)
 
-        feed = self._create_new_feed(feed_type, feed_title, context)
+        timer = profiling.Timer()
+        with timer:
+            feed = self._create_new_feed(feed_type, feed_title, context)
 
-        # FEED_MAX_ITEMS = None means [:None] to get every element
-        for element in elements[: self.settings["FEED_MAX_ITEMS"]]:
-            self._add_item_to_the_feed(feed, element)
+            # FEED_MAX_ITEMS = None means [:None] to get every element
+            for element in elements[: self.settings["FEED_MAX_ITEMS"]]:
+                self._add_item_to_the_feed(feed, element)
 
         signals.feed_generated.send(context, feed=feed)
         if path:
@@ -166,13 +209,26 @@ class Writer:
             except Exception:
                 pass
 
-            with self._open_w(complete_path, "utf-8", override_output) as fp:
-                feed.write(fp, "utf-8")
-                logger.info("Writing %s", complete_path)
+            if self._is_up_to_date(
+                complete_path,
+                context,
+                elements=elements[: self.settings["FEED_MAX_ITEMS"]],
+                feed_type=feed_type,
+                url=url,
+                feed_title=feed_title,
+            ):
+                self._get_write_target(complete_path, override_output)
+            else:
+                with self._open_w(complete_path, "utf-8", override_output) as fp:
+                    with timer:
+                        feed.write(fp, "utf-8")
+                    logger.info("Writing %s", complete_path)
+                profiling.record_render(path, f"{feed_type} feed", timer)
 
             signals.feed_written.send(complete_path, context=context, feed=feed)
         return feed
 
+    @profiling.traced("writer", arg="name")
     def write_file(
         self,
         name,
@@ -207,27 +263,6 @@ class Writer:
             # other stuff, just return for now
             return
 
-        def _write_file(template, localcontext, output_path, name, override):
-            """Render the template write the file."""
-            # set localsiteurl for context so that Contents can adjust links
-            if localcontext["localsiteurl"]:
-                context["localsiteurl"] = localcontext["localsiteurl"]
-            output = template.render(localcontext)
-            path = sanitised_join(output_path, name)
-
-            try:
-                os.makedirs(os.path.dirname(path))
-            except Exception:
-                pass
-
-            with self._open_w(path, "utf-8", override=override) as f:
-                f.write(output)
-            logger.info("Writing %s", path)
-
-            # Send a signal to say we're writing a file with some specific
-            # local context.
-            signals.content_written.send(path, context=localcontext)
-
         def _get_localcontext(context, name, kwargs, relative_urls):
             localcontext = context.copy()
             localcontext["localsiteurl"] = localcontext.get("localsiteurl", None)
@@ -281,14 +316,164 @@ class Writer:
                 localcontext = _get_localcontext(
                     context, page.save_as, paginated_kwargs, relative_urls
                 )
-                _write_file(
-                    template,
-                    localcontext,
-                    self.output_path,
-                    page.save_as,
-                    override_output,
+                self._write_file(
+                    template, context, localcontext, page.save_as, override_output
                 )
         else:
             # no pagination
             localcontext = _get_localcontext(context, name, kwargs, relative_urls)
-            _write_file(template, localcontext, self.output_path, name, override_output)
+            self._write_file(template, context, localcontext, name, override_output)
+
+    def _write_file(self, template, context, localcontext, name, override):
+        """Render the template and write the file."""
+        # set localsiteurl for context so that Contents can adjust links
+        if localcontext["localsiteurl"]:
+            context["localsiteurl"] = localcontext["localsiteurl"]
+        path = sanitised_join(self.output_path, name)
+
+        if self._is_up_to_date(path, context, localcontext, template):
+            self._get_write_target(path, override)
+        else:
+            with profiling.Timer() as timer:
+                output = template.render(localcontext)
+            profiling.record_render(name, template.name, timer)
+
+            try:
+                os.makedirs(os.path.dirname(path))
+            except Exception:
+                pass
+
+            with self._open_w(path, "utf-8", override=override) as f:
+                f.write(output)
+            logger.info("Writing %s", path)
+
+        # Send a signal to say we're writing a file with some specific
+        # local context.
+        signals.content_written.send(path, context=localcontext)
+
+    def flush(self):
+        """Finish writing the files requested so far.
+
+        Files are written as soon as write_file() is called, so there is
+        nothing to do here; see ParallelWriter.
+        """
+
+
+class ParallelWriter(Writer):
+    """Writer rendering templates in a pool of worker processes.
+
+    write_file() only queues the files to write. They are rendered and written
+    by forked worker processes when flush() is called (or when too many files
+    are queued), so that the workers get a copy of the context and of the
+    Jinja environment without having to pickle them.
+
+    Duplicate and overridden output files are detected when the files are
+    queued, in the same order as with Writer, and the content_written signal
+    is sent from the main process, in that order, once the files exist.
+    Intrasite links of the written article or page are resolved when it is
+    queued, as doing so may relocate {attach}-ed static files.
+    """
+
+    max_queued_files = 1000
+
+    def __init__(self, output_path, settings=None):
+        super().__init__(output_path, settings=settings)
+        self.workers = self.settings.get("WRITER_WORKERS") or os.cpu_count() or 1
+        self._queue = []
+        self._queued_paths = {}
+
+    def _write_file(self, template, context, localcontext, name, override):
+        """Queue the file to be rendered and written by flush()."""
+        if localcontext["localsiteurl"]:
+            context["localsiteurl"] = localcontext["localsiteurl"]
+        for key in ("article", "page"):
+            content = localcontext.get(key)
+            if isinstance(content, Content):
+                content.get_content(context["localsiteurl"])
+
+        path = sanitised_join(self.output_path, name)
+        try:
+            os.makedirs(os.path.dirname(path))
+        except Exception:
+            pass
+
+        job = _QueuedFile(template, context, localcontext, path)
+        up_to_date = self._is_up_to_date(path, context, localcontext, template)
+        target = self._get_write_target(path, override)
+        if target != os.devnull and not up_to_date:
+            # only the last of several writes to a file has to be rendered
+            if path in self._queued_paths:
+                self._queued_paths[path].target = None
+            self._queued_paths[path] = job
+            job.target = target
+        self._queue.append(job)
+
+        if len(self._queue) >= self.max_queued_files:
+            self.flush()
+
+    def flush(self):
+        """Render and write the queued files, then send their
+        content_written signals.
+        """
+        queue, self._queue, self._queued_paths = self._queue, [], {}
+        to_render = [i for i, job in enumerate(queue) if job.target is not None]
+
+        if (
+            self.workers > 1
+            and len(to_render) > 1
+            and "fork" in multiprocessing.get_all_start_methods()
+        ):
+            workers = min(self.workers, len(to_render))
+            _queued_files[:] = queue
+            try:
+                with ProcessPoolExecutor(
+                    max_workers=workers,
+                    mp_context=multiprocessing.get_context("fork"),
+                ) as executor:
+                    timers = list(
+                        executor.map(
+                            _write_queued_file,
+                            to_render,
+                            chunksize=max(1, len(to_render) // (workers * 4)),
+                        )
+                    )
+            finally:
+                _queued_files.clear()
+        else:
+            timers = [queue[i].write() for i in to_render]
+
+        for i, timer in zip(to_render, timers):
+            name = os.path.relpath(queue[i].path, self.output_path)
+            profiling.record_render(name, queue[i].template.name, timer)
+
+        for job in queue:
+            logger.info("Writing %s", job.path)
+            signals.content_written.send(job.path, context=job.localcontext)
+
+
+class _QueuedFile:
+    """A file queued by ParallelWriter, rendered into *target* if set."""
+
+    def __init__(self, template, context, localcontext, path):
+        self.template = template
+        self.context = context
+        self.localcontext = localcontext
+        self.path = path
+        self.target = None
+
+    def write(self):
+        if self.localcontext["localsiteurl"]:
+            self.context["localsiteurl"] = self.localcontext["localsiteurl"]
+        with profiling.Timer() as timer:
+            output = self.template.render(self.localcontext)
+        with open(self.target, "w", encoding="utf-8") as f:
+            f.write(output)
+        return timer
+
+
+# Files being written by the worker processes of ParallelWriter.flush()
+_queued_files = []
+
+
+def _write_queued_file(index):
+    return _queued_files[index].write()